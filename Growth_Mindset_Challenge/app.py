@@ -1,7 +1,13 @@
 import streamlit as st
-import pandas as pd
 import os
 from io import BytesIO
+from streaming import chunk_rows_for_ceiling, fingerprints_fit, preview_csv, clean_csv_chunks, write_csv_chunks
+from frame_cache import frame_cache, load_cached, content_digest, derived_key
+from formats import UPLOAD_TYPES, CONVERSION_FORMATS, is_columnar, read_columns, read_frame, write_frame
+from parallel import DEFAULT_WORKERS, parse_file, convert_file, run_parallel, zip_outputs
+from pipeline import DEDUPE_STEPS, run_pipeline, describe_step
+from downsample import DEFAULT_POINTS, downsample
+from compact import compact_frame
 
 # Set page config
 st.set_page_config(page_title="Data Sweeper", layout='wide', page_icon=":bar_chart:")
@@ -95,77 +101,299 @@ st.markdown("""
 
 # Title and description
 st.title("Data Sweeper")
-st.write("Transform your file between CSV and Excel format with built-in data cleaning and visualization!")
-st.write("Upload a CSV or Excel file to clean, analyze, and visualize your data.")
+st.write("Transform your file between CSV, Excel, Parquet and Feather formats with built-in data cleaning and visualization!")
+st.write("Upload a CSV, Excel, Parquet or Feather file to clean, analyze, and visualize your data.")
+
+# Streaming mode for large CSV files
+st.sidebar.subheader("Large Files")
+streaming_mode = st.sidebar.checkbox("Streaming mode for CSV files")
+memory_limit_mb = st.sidebar.number_input("Memory ceiling (MB)", min_value=16, value=256, step=16, disabled=not streaming_mode)
+
+# Compact load shrinks numeric dtypes and turns repeated strings into categoricals
+compact_mode = st.sidebar.checkbox("Compact load (smaller dtypes)")
+
+# Parsed files are cached by content so reruns skip the parse
+st.sidebar.subheader("Parse Cache")
+cache_limit_mb = st.sidebar.number_input("Cache size (MB)", min_value=64, value=1024, step=64)
+frame_cache.resize(cache_limit_mb)
+if st.sidebar.button("Clear Cache"):
+    frame_cache.clear()
+cache_stats = frame_cache.stats()
+st.sidebar.write(f"{cache_stats['entries']} files cached, {cache_stats['used_mb']:.1f} / {cache_stats['max_mb']:.0f} MB used")
+st.sidebar.write(f"Hits: {cache_stats['hits']} | Misses: {cache_stats['misses']} | Evictions: {cache_stats['evictions']}")
+
+# Multiple files are parsed and converted across a process pool
+st.sidebar.subheader("Parallel Processing")
+max_workers = st.sidebar.number_input("Worker processes", min_value=1, max_value=64, value=DEFAULT_WORKERS, step=1)
+
+
+def process_streaming_csv(file):
+    st.write(f"**File Name:** {file.name}")
+    st.write(f"**File Size:** {file.size / 1024:.2f} KB")
+
+    st.write("Preview the head of the Dataframe")
+    preview = preview_csv(file)
+    st.dataframe(preview)
+
+    st.subheader("Data Cleaning Options")
+    col1, col2 = st.columns(2)
+    with col1:
+        remove_duplicates = st.checkbox(f"Remove Duplicates for {file.name}")
+    with col2:
+        fill_missing = st.checkbox(f"Fill Missing Values for {file.name}")
+
+    dedupe_keys, fold_case, fold_whitespace, out_of_core = None, False, False, False
+    if remove_duplicates:
+        dedupe_keys = st.multiselect(f"Duplicate key columns for {file.name} (empty means all)", preview.columns)
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            fold_case = st.checkbox(f"Ignore case for {file.name}")
+        with col2:
+            fold_whitespace = st.checkbox(f"Ignore extra spaces for {file.name}")
+        with col3:
+            out_of_core = st.checkbox(f"Spill fingerprints to disk for {file.name}")
+        if not out_of_core and not fingerprints_fit(file, memory_limit_mb):
+            st.caption("The fingerprints may not fit in the memory ceiling, so they are spilled to disk.")
+
+    # Part of the ceiling is kept for the fingerprints when removing duplicates
+    chunk_rows = chunk_rows_for_ceiling(file, memory_limit_mb, remove_duplicates)
+    st.write(f"**Chunk Size:** {chunk_rows:,} rows")
+
+    st.subheader("Select Columns to Convert")
+    columns = st.multiselect(f"Choose Columns for {file.name}", preview.columns, default=preview.columns)
+
+    st.subheader("Convert the file")
+    st.info("Streaming mode exports to CSV chunk by chunk. Visualizations need the full file and are skipped.")
+    if st.button(f"Convert {file.name}"):
+        buffer = BytesIO()
+        chunks = clean_csv_chunks(file, chunk_rows, columns, remove_duplicates, fill_missing,
+                                  dedupe_keys, fold_case, fold_whitespace, out_of_core, memory_limit_mb)
+        rows = write_csv_chunks(chunks, buffer)
+        buffer.seek(0)
+        st.write(f"{rows:,} rows written.")
+
+        st.download_button(
+            label=f"Download {file.name} as CSV",
+            data=buffer,
+            file_name=file.name,
+            mime="text/csv"
+        )
+
+
+def upload_digest(file):
+    # Hashing reads the whole upload, so it's done once per upload and
+    # kept in the session for every later rerun
+    digests = st.session_state.setdefault("upload_digests", {})
+    if file.file_id not in digests:
+        digests[file.file_id] = content_digest(file)
+    return digests[file.file_id]
+
+
+def report_key(frame_key):
+    return frame_key + ":compact_report"
+
+
+def load_upload(file, file_extension, columns=None):
+    loaded = {}
+
+    def loader(f):
+        df = read_frame(f, file_extension, columns)
+        if compact_mode:
+            df, loaded["report"] = compact_frame(df)
+        return df
+
+    df, frame_key = load_cached(file, loader, file_extension, columns, compact_mode, digest=upload_digest(file))
+    if "report" in loaded:
+        frame_cache.put(report_key(frame_key), loaded["report"])
+    return df, frame_key
+
+
+def progress_reporter(label, names):
+    progress_bar = st.progress(0.0, text=label)
+    log = st.empty()
+    finished = []
+
+    def on_done(job, done, total_jobs, ok):
+        finished.append(f"{'✅' if ok else '❌'} {names[job]}")
+        progress_bar.progress(done / total_jobs, text=f"{label} ({done}/{total_jobs})")
+        log.write(" | ".join(finished))
+
+    return on_done
+
+
+def parse_uploads_in_parallel(files):
+    # Jobs are keyed by upload position, uploads can share a file name
+    jobs = {}
+    keys = {}
+    names = {}
+    for index, file in enumerate(files):
+        file_extension = os.path.splitext(file.name)[-1].lower()
+        if file_extension not in (".csv", ".xlsx"):
+            continue
+        key = derived_key(upload_digest(file), file_extension, None, compact_mode)
+        if key not in frame_cache and key not in keys.values():
+            jobs[index] = (file.getvalue(), file_extension, compact_mode)
+            keys[index] = key
+            names[index] = file.name
+    if len(jobs) < 2:
+        return
+    results, errors = run_parallel(parse_file, jobs, max_workers, progress_reporter("Parsing files", names))
+    for index, (df, report) in results.items():
+        frame_cache.put(keys[index], df)
+        if report is not None:
+            frame_cache.put(report_key(keys[index]), report)
+    for index, error in errors.items():
+        st.error(f"Could not parse {names[index]}: {error}")
+
+
+def batch_convert(files):
+    st.subheader("Batch Convert All Files")
+    col1, col2 = st.columns(2)
+    with col1:
+        batch_duplicates = st.checkbox("Remove duplicates in every file")
+    with col2:
+        batch_missing = st.checkbox("Fill missing values in every file")
+    batch_type = st.radio("Convert all files to", tuple(CONVERSION_FORMATS), key="batch_conversion_type")
+    if not st.button("Convert All Files"):
+        return
+
+    jobs = {}
+    names = {}
+    for index, file in enumerate(files):
+        file_extension = os.path.splitext(file.name)[-1].lower()
+        jobs[index] = (file.name, file.getvalue(), file_extension, batch_type, batch_duplicates, batch_missing)
+        names[index] = file.name
+    results, errors = run_parallel(convert_file, jobs, max_workers, progress_reporter("Converting files", names))
+
+    for index, result in sorted(results.items()):
+        st.write(f"**{names[index]}:** {result['rows_in']:,} → {result['rows_out']:,} rows in {result['seconds']:.2f}s")
+    for index, error in sorted(errors.items()):
+        st.error(f"Could not convert {names[index]}: {error}")
+    if results:
+        st.download_button(
+            label=f"Download {len(results)} files as ZIP",
+            data=zip_outputs(results),
+            file_name="data_sweeper.zip",
+            mime="application/zip"
+        )
+
 
 # File uploader
-uploaded_files = st.file_uploader("Upload your files (CSV or Excel)", type=["csv", "xlsx"], accept_multiple_files=True)
+uploaded_files = st.file_uploader("Upload your files (CSV, Excel, Parquet or Feather)", type=UPLOAD_TYPES, accept_multiple_files=True)
 
 if uploaded_files:
+    # Digests of removed uploads are dropped
+    current = {file.file_id for file in uploaded_files}
+    st.session_state.upload_digests = {
+        file_id: digest for file_id, digest in st.session_state.get("upload_digests", {}).items() if file_id in current
+    }
+    if not streaming_mode:
+        parse_uploads_in_parallel(uploaded_files)
+
     for file in uploaded_files:
         file_extension = os.path.splitext(file.name)[-1].lower()
 
-        if file_extension == ".csv":
-            df = pd.read_csv(file)
-        elif file_extension == ".xlsx":
-            df = pd.read_excel(file)
+        if streaming_mode and file_extension == ".csv":
+            process_streaming_csv(file)
+            continue
+
+        columns_key = f"columns_{file.name}"
+        if is_columnar(file_extension):
+            # Columnar readers only decode the columns picked further down
+            all_columns = read_columns(file, file_extension)
+            selected_columns = [column for column in st.session_state.get(columns_key, all_columns) if column in all_columns]
+            df, frame_key = load_upload(file, file_extension, selected_columns)
+        elif file_extension in (".csv", ".xlsx"):
+            df, frame_key = load_upload(file, file_extension)
+            all_columns = list(df.columns)
         else:
             st.error(f"Invalid file format. Please upload a file with {file_extension} extension.")
             continue
 
         st.write(f"**File Name:** {file.name}")
         st.write(f"**File Size:** {file.size / 1024:.2f} KB")
+
+        if compact_mode:
+            report = frame_cache.get(report_key(frame_key))
+            if report is not None:
+                before, after = report["Before (MB)"].sum(), report["After (MB)"].sum()
+                with st.expander(f"Memory: {before:.2f} MB → {after:.2f} MB"):
+                    st.dataframe(report.round(3))
         
         st.write("Preview the head of the Dataframe")
         st.dataframe(df.head())
         
+        # Cleaning steps are kept per file and replayed on every rerun
+        steps = st.session_state.setdefault(f"pipeline_{file.name}", [])
+
         st.subheader("Data Cleaning Options")
         
         if st.checkbox(f"Clean Data For {file.name}"):
-            col1, col2 = st.columns(2)
+            col1, col2, col3 = st.columns(3)
             
             with col1:
                 if st.button(f"Remove Duplicates for {file.name}"):
-                    original_count = len(df)
-                    df.drop_duplicates(inplace=True)
-                    st.write(f"Duplicates removed successfully. {original_count - len(df)} rows dropped.")
+                    steps.append(("dedupe",))
                     
             with col2:
                 if st.button(f"Fill Missing Values for {file.name}"):
-                    numeric_cols = df.select_dtypes(include=['number']).columns
-                    df[numeric_cols] = df[numeric_cols].fillna(df[numeric_cols].mean())
-                    st.write("Missing values have been filled with the mean of respective columns.")
+                    steps.append(("fill_mean",))
+
+            with col3:
+                if st.button(f"Undo Last Step for {file.name}", disabled=not steps):
+                    steps.pop()
+
+            with st.expander(f"Fuzzy duplicates for {file.name}"):
+                # Rows match on 64-bit fingerprints of the chosen keys after normalization
+                dedupe_keys = st.multiselect(f"Key columns for {file.name} (empty means all)", all_columns)
+                fold_case = st.checkbox(f"Ignore case for {file.name}")
+                fold_whitespace = st.checkbox(f"Ignore extra spaces for {file.name}")
+                if st.button(f"Remove Fuzzy Duplicates for {file.name}"):
+                    steps.append(("fingerprint_dedupe", tuple(dedupe_keys), fold_case, fold_whitespace))
             
         st.subheader("Select Columns to Convert")
-        columns = st.multiselect(f"Choose Columns for {file.name}", df.columns, default=df.columns)
-        df = df[columns]
+        columns = st.multiselect(f"Choose Columns for {file.name}", all_columns, default=all_columns, key=columns_key)
+
+        if any(step[0] in DEDUPE_STEPS for step in steps) and len(df.columns) < len(all_columns):
+            # Duplicates are found before columns are selected, so they
+            # need the columns that are not exported too
+            df, frame_key = load_upload(file, file_extension, all_columns)
+        original_count = len(df)
+        df, computed = run_pipeline(df, frame_key, steps + [("select", tuple(columns))])
+        if steps:
+            st.write(f"**Cleaning Steps:** {' → '.join(describe_step(step) for step in steps)}")
+            st.write(f"{original_count - len(df)} rows dropped. {computed} of {len(steps) + 1} steps computed, the rest reused from cache.")
         
         # Data Visualization
         st.subheader("Data Visualization")
         if st.checkbox(f"Show Visualizations for {file.name}"):
             chart_type = st.selectbox(f"Select Chart Type for {file.name}", ["Bar Chart", "Line Chart", "Area Chart"])
+            col1, col2 = st.columns(2)
+            with col1:
+                max_points = st.number_input(f"Max chart points for {file.name}", min_value=100, value=DEFAULT_POINTS, step=100)
+            with col2:
+                method = st.selectbox(f"Downsampling for {file.name}", ["minmax", "lttb"])
+
+            # Only a bounded number of rows is sent to the browser
+            chart_data = df.select_dtypes(include='number').iloc[: , :2]
+            chart_data = downsample(chart_data, max_points, method)
+            if len(chart_data) < len(df):
+                st.caption(f"Showing {len(chart_data):,} of {len(df):,} rows ({method} downsampling).")
             
             if chart_type == "Bar Chart":
-                st.bar_chart(df.select_dtypes(include='number').iloc[: , :2])
+                st.bar_chart(chart_data)
             elif chart_type == "Line Chart":
-                st.line_chart(df.select_dtypes(include='number').iloc[: , :2])
+                st.line_chart(chart_data)
             elif chart_type == "Area Chart":
-                st.area_chart(df.select_dtypes(include='number').iloc[: , :2])
+                st.area_chart(chart_data)
         
-        # Convert the file (CSV to Excel)
+        # Convert the file (CSV, Excel, Parquet or Feather)
         st.subheader("Convert the file")
-        conversion_type = st.radio(f"Convert {file.name} to", ("CSV", "Excel"), key=file.name)
+        conversion_type = st.radio(f"Convert {file.name} to", tuple(CONVERSION_FORMATS), key=file.name)
         if st.button(f"Convert {file.name}"):
             buffer = BytesIO()
-            if conversion_type == "CSV":
-                df.to_csv(buffer, index=False)
-                file_name = file.name.replace(file_extension, ".csv")
-                mime_type = "text/csv"
-            elif conversion_type == "Excel":
-                df.to_excel(buffer, index=False)
-                file_name = file.name.replace(file_extension, ".xlsx")
-                mime_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                
+            new_extension, mime_type = write_frame(df, buffer, conversion_type)
+            file_name = file.name.replace(file_extension, new_extension)
             buffer.seek(0)
             
             # Download Button
@@ -176,4 +404,7 @@ if uploaded_files:
                 mime=mime_type
             )
 
+    if len(uploaded_files) > 1:
+        batch_convert(uploaded_files)
+
 st.success("All files processed!")
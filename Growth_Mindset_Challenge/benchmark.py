@@ -0,0 +1,219 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+from cleaning import remove_duplicates, fill_missing
+from formats import read_frame, write_frame
+
+DEFAULT_ROWS = [10_000, 100_000, 1_000_000, 10_000_000]
+DEFAULT_FORMATS = ["csv", "xlsx"]
+EXCEL_MAX_ROWS = 1_048_575
+STAGES = ["read", "dedupe", "fill", "write_csv", "write_excel"]
+
+
+class PeakMemory:
+    # Samples resident memory on a background thread while a stage runs.
+    # Falls back to the process-wide peak where /proc is not available.
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.peak = 0
+        self.running = False
+        self.page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+    def current(self):
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * self.page_size
+        except OSError:
+            import resource
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return peak if sys.platform == "darwin" else peak * 1024
+
+    def sample(self):
+        while self.running:
+            self.peak = max(self.peak, self.current())
+            time.sleep(self.interval)
+
+    def __enter__(self):
+        self.peak = self.current()
+        self.running = True
+        self.thread = threading.Thread(target=self.sample, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.running = False
+        self.thread.join()
+        self.peak = max(self.peak, self.current())
+
+
+def generate_frame(rows, dup_ratio, null_ratio, seed):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "id": rng.integers(0, rows * 10, rows),
+        "category": rng.choice(["alpha", "beta", "gamma", "delta", "epsilon"], rows),
+        "quantity": rng.integers(0, 1000, rows),
+        "price": rng.normal(100, 25, rows).round(2),
+        "score": rng.random(rows),
+    })
+    for column in ("price", "score"):
+        df.loc[rng.random(rows) < null_ratio, column] = np.nan
+    # Copy rows over a share of the frame to create exact duplicates.
+    # Sources are drawn only from rows that are never overwritten, so
+    # exactly dups rows end up as copies.
+    dups = min(int(rows * dup_ratio), rows - 1)
+    if dups > 0:
+        order = rng.permutation(rows)
+        targets = order[:dups]
+        sources = rng.choice(order[dups:], dups)
+        for column in df.columns:
+            df.loc[targets, column] = df[column].to_numpy()[sources]
+    return df
+
+
+def data_file(data_dir, file_format, rows, dup_ratio, null_ratio, seed):
+    name = f"bench_{rows}_dup{dup_ratio}_null{null_ratio}_seed{seed}.{file_format}"
+    path = os.path.join(data_dir, name)
+    if not os.path.exists(path):
+        df = generate_frame(rows, dup_ratio, null_ratio, seed)
+        if file_format == "csv":
+            df.to_csv(path, index=False)
+        else:
+            df.to_excel(path, index=False)
+    return path
+
+
+def run_case(path, file_format, rows):
+    results = []
+
+    def measure(stage, func):
+        with PeakMemory() as memory:
+            started = time.perf_counter()
+            value = func()
+            seconds = time.perf_counter() - started
+        results.append({"stage": stage, "seconds": seconds, "peak_rss_mb": memory.peak / (1024 * 1024)})
+        return value
+
+    with open(path, "rb") as f:
+        df = measure("read", lambda: read_frame(f, f".{file_format}"))
+    df = measure("dedupe", lambda: remove_duplicates(df))
+    df = measure("fill", lambda: fill_missing(df))
+    measure("write_csv", lambda: write_frame(df, BytesIO(), "CSV"))
+    if rows <= EXCEL_MAX_ROWS:
+        measure("write_excel", lambda: write_frame(df, BytesIO(), "Excel"))
+    return results
+
+
+def run_benchmark(rows_list, formats, dup_ratio, null_ratio, seed, data_dir, repeat=1):
+    records = []
+    for rows in rows_list:
+        for file_format in formats:
+            if file_format == "xlsx" and rows > EXCEL_MAX_ROWS:
+                print(f"Skipping xlsx at {rows:,} rows (over the Excel sheet limit)")
+                continue
+            path = data_file(data_dir, file_format, rows, dup_ratio, null_ratio, seed)
+            for run in range(repeat):
+                # A fresh process per case keeps peak RSS from leaking between cases
+                with ProcessPoolExecutor(max_workers=1) as pool:
+                    results = pool.submit(run_case, path, file_format, rows).result()
+                for result in results:
+                    record = {"format": file_format, "rows": rows, "run": run, **result}
+                    records.append(record)
+                    print(f"{file_format:>5} {rows:>12,} {result['stage']:<12} "
+                          f"{result['seconds']:>9.3f}s {result['peak_rss_mb']:>9.1f} MB")
+    return records
+
+
+METRICS = {"seconds": "s", "peak_rss_mb": " MB"}
+
+
+def summarize(records):
+    # Best run per (format, rows, stage) for each metric, which is the
+    # least noisy number
+    best = {}
+    for record in records:
+        key = (record["format"], record["rows"], record["stage"])
+        for metric in METRICS:
+            if metric in record:
+                best.setdefault(key, {})
+                best[key][metric] = min(best[key].get(metric, record[metric]), record[metric])
+    return best
+
+
+def compare(records, params, baseline_path, threshold):
+    # Results are only comparable for the same generated data
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    if baseline.get("params") != params:
+        raise ValueError(f"Baseline was run with {baseline.get('params')}, not {params}")
+    baseline = summarize(baseline["records"])
+    regressions = []
+    for key, record in summarize(records).items():
+        previous = baseline.get(key, {})
+        for metric, value in record.items():
+            if previous.get(metric, 0) > 0 and value > previous[metric] * (1 + threshold):
+                regressions.append((key, metric, previous[metric], value))
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Data Sweeper stages on synthetic files.")
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS, help="row counts to test")
+    parser.add_argument("--formats", nargs="+", choices=DEFAULT_FORMATS, default=DEFAULT_FORMATS)
+    parser.add_argument("--dup-ratio", type=float, default=0.1, help="share of rows that are duplicates")
+    parser.add_argument("--null-ratio", type=float, default=0.05, help="share of missing numeric values")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=1, help="runs per case")
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "data_sweeper_bench"),
+                        help="where generated files are kept and reused")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON file for the results")
+    parser.add_argument("--compare", help="baseline results JSON to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed increase in time or peak memory against the baseline")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    os.makedirs(args.data_dir, exist_ok=True)
+    params = {"dup_ratio": args.dup_ratio, "null_ratio": args.null_ratio, "seed": args.seed}
+    records = run_benchmark(args.rows, args.formats, args.dup_ratio, args.null_ratio,
+                            args.seed, args.data_dir, args.repeat)
+
+    with open(args.output, "w") as f:
+        json.dump({
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "params": params,
+            "records": records,
+        }, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        try:
+            regressions = compare(records, params, args.compare, args.threshold)
+        except ValueError as e:
+            print(f"Not comparing against {args.compare}: {e}", file=sys.stderr)
+            return 1
+        for (file_format, rows, stage), metric, before, after in regressions:
+            unit = METRICS[metric]
+            print(f"REGRESSION {file_format} {rows:,} {stage} {metric}: {before:.3f}{unit} → {after:.3f}{unit}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,8 @@
+def remove_duplicates(df):
+    return df.drop_duplicates()
+
+
+def fill_missing(df):
+    numeric_cols = df.select_dtypes(include=['number']).columns
+    return df.fillna(df[numeric_cols].mean())
+
@@ -0,0 +1,88 @@
+import argparse
+import json
+import os
+import sys
+
+from engine import DEFAULT_MEMORY_LIMIT_MB, SUPPORTED_EXTENSIONS, plan_outputs, process_file
+from formats import CONVERSION_FORMATS
+from parallel import DEFAULT_WORKERS, run_parallel
+
+FORMAT_NAMES = {name.lower(): name for name in CONVERSION_FORMATS}
+
+
+def find_files(input_dir, recursive=False):
+    found = []
+    for root, dirs, files in os.walk(input_dir):
+        found.extend(os.path.join(root, name) for name in files
+                     if os.path.splitext(name)[-1].lower() in SUPPORTED_EXTENSIONS)
+        if not recursive:
+            break
+    return sorted(found)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Clean and convert a directory of files without the Streamlit UI.")
+    parser.add_argument("input_dir", help="directory with CSV, Excel, Parquet or Feather files")
+    parser.add_argument("output_dir", help="directory for the converted files")
+    parser.add_argument("--to", choices=sorted(FORMAT_NAMES), default="csv", help="output format (default: csv)")
+    parser.add_argument("--dedupe", action="store_true", help="remove duplicate rows")
+    parser.add_argument("--fill-missing", action="store_true", help="fill numeric gaps with the column mean")
+    parser.add_argument("--columns", help="comma-separated columns to keep")
+    parser.add_argument("--compact", action="store_true", help="downcast numerics and categorize repeated strings")
+    parser.add_argument("--stream", action="store_true", help="process CSV to CSV in chunks")
+    parser.add_argument("--memory-limit-mb", type=int, default=DEFAULT_MEMORY_LIMIT_MB,
+                        help=f"memory ceiling per file in streaming mode (default: {DEFAULT_MEMORY_LIMIT_MB})")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="number of worker processes")
+    parser.add_argument("--recursive", action="store_true", help="include files in subdirectories")
+    parser.add_argument("--stats-json", help="write per-file stage timings to this JSON file")
+    return parser.parse_args(argv)
+
+
+def print_stats(results):
+    stages = {}
+    for result in results.values():
+        for stage, seconds in result["timings"].items():
+            stages[stage] = stages.get(stage, 0.0) + seconds
+        rows = f"{result['rows_out']:,} rows" if result["rows_in"] is None else f"{result['rows_in']:,} → {result['rows_out']:,} rows"
+        timings = ", ".join(f"{stage} {seconds:.3f}s" for stage, seconds in result["timings"].items())
+        print(f"  {os.path.basename(result['file'])}: {rows} in {result['seconds']:.3f}s ({timings})")
+    if stages:
+        print("Total time per stage: " + ", ".join(f"{stage} {seconds:.3f}s" for stage, seconds in stages.items()))
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    files = find_files(args.input_dir, args.recursive)
+    if not files:
+        print(f"No supported files found in {args.input_dir}", file=sys.stderr)
+        return 1
+    try:
+        output_dirs = plan_outputs(files, args.input_dir, args.output_dir, FORMAT_NAMES[args.to])
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    columns = [column.strip() for column in args.columns.split(",")] if args.columns else None
+    jobs = {
+        path: (path, output_dirs[path], FORMAT_NAMES[args.to], args.dedupe, args.fill_missing,
+               columns, args.compact, args.stream, args.memory_limit_mb)
+        for path in files
+    }
+
+    def on_done(name, done, total, ok):
+        print(f"[{done}/{total}] {'done' if ok else 'FAILED'} {name}")
+
+    results, errors = run_parallel(process_file, jobs, args.workers, on_done)
+    print_stats(results)
+    for name, error in errors.items():
+        print(f"Error in {name}: {error}", file=sys.stderr)
+
+    if args.stats_json:
+        with open(args.stats_json, "w") as f:
+            json.dump({"results": list(results.values()), "errors": errors}, f, indent=2)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
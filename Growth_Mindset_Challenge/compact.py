@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+from pandas.api import types
+
+# Text columns with at most this share of distinct values become categoricals
+CATEGORY_RATIO = 0.5
+
+
+def compact_series(s, category_ratio=CATEGORY_RATIO):
+    if types.is_bool_dtype(s) or isinstance(s.dtype, pd.CategoricalDtype):
+        return s
+    if types.is_integer_dtype(s):
+        if s.empty:
+            return s
+        return pd.to_numeric(s, downcast="integer" if s.min() < 0 else "unsigned")
+    if types.is_float_dtype(s):
+        # Only downcast when float32 holds every value exactly
+        smaller = s.astype("float32")
+        if ((smaller.astype(s.dtype) == s) | s.isna()).all():
+            return smaller
+        return s
+    if types.is_object_dtype(s) or types.is_string_dtype(s):
+        if len(s) and s.nunique(dropna=True) <= category_ratio * len(s):
+            return s.astype("category")
+    return s
+
+
+def compact_frame(df, category_ratio=CATEGORY_RATIO):
+    columns = {}
+    report = []
+    for column in df.columns:
+        before = df[column]
+        after = compact_series(before, category_ratio)
+        columns[column] = after
+        report.append({
+            "Column": str(column),
+            "Before": str(before.dtype),
+            "After": str(after.dtype),
+            "Before (MB)": before.memory_usage(deep=True, index=False) / (1024 * 1024),
+            "After (MB)": after.memory_usage(deep=True, index=False) / (1024 * 1024),
+        })
+    compacted = pd.DataFrame(columns, index=df.index)
+    report = pd.DataFrame(report, columns=["Column", "Before", "After", "Before (MB)", "After (MB)"])
+    report["Saved"] = np.where(report["Before (MB)"] > 0, 1 - report["After (MB)"] / report["Before (MB)"], 0.0)
+    return compacted, report
@@ -0,0 +1,104 @@
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+from pandas.api import types
+
+DEFAULT_PARTITIONS = 64
+
+
+def split_numbers(s):
+    # Integers are hashed as they are, never through float64 where large
+    # values collapse. Floats that are whole numbers convert to integers
+    # without loss, so 1 and 1.0 still match, also across chunks where
+    # pandas inferred different dtypes. Every other float is kept apart.
+    if types.is_integer_dtype(s):
+        return s, pd.Series(np.nan, index=s.index)
+    whole = s.notna() & (s % 1 == 0) & (s.abs() < 2 ** 63)
+    return s.where(whole).astype("Int64"), s.mask(whole).astype("float64")
+
+
+def normalize_frame(df, fold_case=False, fold_whitespace=False):
+    columns = []
+    for column in df.columns:
+        s = df[column]
+        if types.is_bool_dtype(s):
+            columns.append(s)
+        elif types.is_integer_dtype(s) or types.is_float_dtype(s):
+            columns.extend(split_numbers(s))
+        elif fold_case or fold_whitespace:
+            s = s.astype("string")
+            if fold_whitespace:
+                s = s.str.strip().str.replace(r"\s+", " ", regex=True)
+            if fold_case:
+                s = s.str.casefold()
+            columns.append(s)
+        else:
+            columns.append(s)
+    return pd.DataFrame(dict(enumerate(columns)), index=df.index)
+
+
+def row_fingerprints(df, subset=None, fold_case=False, fold_whitespace=False):
+    if subset:
+        df = df[list(subset)]
+    df = normalize_frame(df, fold_case, fold_whitespace)
+    return pd.util.hash_pandas_object(df, index=False).to_numpy(dtype=np.uint64)
+
+
+def drop_fingerprint_duplicates(df, subset=None, fold_case=False, fold_whitespace=False):
+    fingerprints = row_fingerprints(df, subset, fold_case, fold_whitespace)
+    _, first = np.unique(fingerprints, return_index=True)
+    keep = np.zeros(len(df), dtype=bool)
+    keep[first] = True
+    return df[keep]
+
+
+def drop_duplicates_out_of_core(make_chunks, subset=None, fold_case=False, fold_whitespace=False,
+                                partitions=DEFAULT_PARTITIONS, work_dir=None):
+    # Three passes over the data, with only one partition of fingerprints
+    # in memory at a time:
+    #   1. spill (fingerprint, row number) pairs to partition files on disk
+    #   2. per partition, mark the first row of every fingerprint as kept
+    #   3. re-read the chunks and yield only the kept rows
+    with tempfile.TemporaryDirectory(dir=work_dir) as tmp:
+        paths = [os.path.join(tmp, f"part_{p}") for p in range(partitions)]
+        handles = [(open(path + ".fp", "wb"), open(path + ".row", "wb")) for path in paths]
+        total = 0
+        try:
+            for chunk in make_chunks():
+                fingerprints = row_fingerprints(chunk, subset, fold_case, fold_whitespace)
+                rows = np.arange(total, total + len(chunk), dtype=np.int64)
+                total += len(chunk)
+                part = fingerprints % partitions
+                order = np.argsort(part, kind="stable")
+                bounds = np.searchsorted(part[order], np.arange(partitions + 1))
+                for p in range(partitions):
+                    selected = order[bounds[p]:bounds[p + 1]]
+                    if len(selected):
+                        fingerprints[selected].tofile(handles[p][0])
+                        rows[selected].tofile(handles[p][1])
+        finally:
+            for fp_handle, row_handle in handles:
+                fp_handle.close()
+                row_handle.close()
+
+        if total == 0:
+            return
+        keep = np.memmap(os.path.join(tmp, "keep.mask"), dtype=bool, mode="w+", shape=(total,))
+        for path in paths:
+            fingerprints = np.fromfile(path + ".fp", dtype=np.uint64)
+            if len(fingerprints):
+                rows = np.fromfile(path + ".row", dtype=np.int64)
+                _, first = np.unique(fingerprints, return_index=True)
+                keep[rows[first]] = True
+            os.remove(path + ".fp")
+            os.remove(path + ".row")
+        keep.flush()
+
+        offset = 0
+        for chunk in make_chunks():
+            mask = np.asarray(keep[offset:offset + len(chunk)])
+            offset += len(chunk)
+            yield chunk[mask]
+        del keep
@@ -0,0 +1,61 @@
+import numpy as np
+
+DEFAULT_POINTS = 2000
+
+
+def minmax_indices(y, n_out):
+    # Keep the smallest and largest value of every bucket so spikes survive.
+    n = len(y)
+    buckets = max(1, n_out // 2)
+    edges = np.linspace(0, n, buckets + 1).astype(np.int64)
+    starts = edges[:-1]
+    starts = starts[starts < n]
+    filled = np.where(np.isnan(y), np.nanmean(y) if np.isfinite(y).any() else 0.0, y)
+    mins = np.minimum.reduceat(filled, starts)
+    maxs = np.maximum.reduceat(filled, starts)
+    ends = np.append(starts[1:], n)
+    positions = np.arange(n)
+    bucket_of = np.repeat(np.arange(len(starts)), ends - starts)
+    is_min = filled == mins[bucket_of]
+    is_max = filled == maxs[bucket_of]
+    first_min = np.minimum.reduceat(np.where(is_min, positions, n), starts)
+    first_max = np.minimum.reduceat(np.where(is_max, positions, n), starts)
+    return np.unique(np.concatenate([first_min, first_max]))
+
+
+def lttb_indices(y, n_out):
+    # Largest-Triangle-Three-Buckets over the row position as x axis.
+    # The per-bucket triangle areas are computed with NumPy; only the
+    # dependency on the previously chosen point is walked in Python.
+    n = len(y)
+    x = np.arange(n, dtype=np.float64)
+    y = np.where(np.isnan(y), 0.0, y)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    chosen = np.empty(n_out, dtype=np.int64)
+    chosen[0], chosen[-1] = 0, n - 1
+    previous = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+        next_start, next_end = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:max(next_end, next_start + 1)].mean()
+        avg_y = y[next_start:max(next_end, next_start + 1)].mean()
+        areas = np.abs(
+            (x[previous] - avg_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (avg_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        chosen[i + 1] = previous
+    return chosen
+
+
+def downsample(df, max_points=DEFAULT_POINTS, method="minmax"):
+    n = len(df)
+    if n <= max_points or df.shape[1] == 0 or max_points < 3:
+        return df
+    values = df.to_numpy(dtype=np.float64, na_value=np.nan)
+    if method == "lttb":
+        picks = [lttb_indices(values[:, i], max_points // df.shape[1] or 3) for i in range(df.shape[1])]
+    else:
+        picks = [minmax_indices(values[:, i], max_points // df.shape[1]) for i in range(df.shape[1])]
+    # Rows picked for any column are kept so every series stays aligned.
+    return df.iloc[np.unique(np.concatenate(picks))]
@@ -0,0 +1,108 @@
+import os
+import time
+from contextlib import contextmanager
+
+from cleaning import remove_duplicates, fill_missing
+from compact import compact_frame
+from formats import CONVERSION_FORMATS, is_columnar, read_frame, write_frame
+from streaming import chunk_rows_for_ceiling, clean_csv_chunks, write_csv_chunks
+
+# The Data Sweeper steps without any Streamlit code, shared by the app's
+# batch mode and the command line in cli.py.
+SUPPORTED_EXTENSIONS = (".csv", ".xlsx", ".parquet", ".feather", ".arrow")
+DEFAULT_MEMORY_LIMIT_MB = 256
+
+
+@contextmanager
+def timed(timings, stage):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - started
+
+
+def run_stages(df, timings, drop_duplicates=False, fill_missing_values=False, columns=None, compact=False):
+    if compact:
+        with timed(timings, "compact"):
+            df, _ = compact_frame(df)
+    if drop_duplicates:
+        with timed(timings, "dedupe"):
+            df = remove_duplicates(df)
+    if fill_missing_values:
+        with timed(timings, "fill"):
+            df = fill_missing(df)
+    if columns:
+        with timed(timings, "select"):
+            df = df[[column for column in columns if column in df.columns]]
+    return df
+
+
+def output_path(path, output_dir, conversion_type):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(output_dir, stem + CONVERSION_FORMATS[conversion_type][0])
+
+
+def plan_outputs(files, input_dir, output_dir, conversion_type):
+    # Returns {path: output directory}, keeping each file's subdirectory
+    # under output_dir. Inputs that would still write the same file, like
+    # x.csv and x.xlsx, are an error instead of one replacing the other.
+    planned = {}
+    claimed = {}
+    for path in files:
+        target_dir = os.path.normpath(os.path.join(output_dir, os.path.relpath(os.path.dirname(path), input_dir)))
+        destination = os.path.normcase(os.path.abspath(output_path(path, target_dir, conversion_type)))
+        if destination in claimed:
+            raise ValueError(f"{claimed[destination]} and {path} would both be written to {output_path(path, target_dir, conversion_type)}")
+        claimed[destination] = path
+        planned[path] = target_dir
+    return planned
+
+
+def can_stream(file_extension, conversion_type, compact=False):
+    return file_extension == ".csv" and conversion_type == "CSV" and not compact
+
+
+def process_file(path, output_dir, conversion_type="CSV", drop_duplicates=False, fill_missing_values=False,
+                 columns=None, compact=False, stream=False, memory_limit_mb=DEFAULT_MEMORY_LIMIT_MB):
+    file_extension = os.path.splitext(path)[-1].lower()
+    if file_extension not in SUPPORTED_EXTENSIONS:
+        raise ValueError(f"Unsupported file format: {file_extension}")
+    destination = output_path(path, output_dir, conversion_type)
+    if os.path.abspath(destination) == os.path.abspath(path):
+        raise ValueError(f"Output would overwrite the input file {path}")
+    os.makedirs(output_dir, exist_ok=True)
+    timings = {}
+    started = time.perf_counter()
+
+    # Both paths remove duplicates before selecting columns, so columns
+    # that are not exported still tell rows apart
+    if stream and can_stream(file_extension, conversion_type, compact):
+        # Load, clean and write overlap chunk by chunk, so they are timed together
+        with open(path, "rb") as source, open(destination, "wb") as target:
+            chunk_rows = chunk_rows_for_ceiling(source, memory_limit_mb, drop_duplicates)
+            with timed(timings, "stream"):
+                chunks = clean_csv_chunks(source, chunk_rows, columns, drop_duplicates, fill_missing_values,
+                                          memory_limit_mb=memory_limit_mb)
+                rows_in = None
+                rows_out = write_csv_chunks(chunks, target)
+    else:
+        with open(path, "rb") as source:
+            with timed(timings, "load"):
+                projected = is_columnar(file_extension) and not drop_duplicates
+                df = read_frame(source, file_extension, columns if projected else None)
+        rows_in = len(df)
+        df = run_stages(df, timings, drop_duplicates, fill_missing_values, columns, compact)
+        rows_out = len(df)
+        with timed(timings, "convert"):
+            with open(destination, "wb") as target:
+                write_frame(df, target, conversion_type)
+
+    return {
+        "file": path,
+        "output": destination,
+        "rows_in": rows_in,
+        "rows_out": rows_out,
+        "timings": timings,
+        "seconds": time.perf_counter() - started,
+    }
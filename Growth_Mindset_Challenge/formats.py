@@ -0,0 +1,56 @@
+import pandas as pd
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+UPLOAD_TYPES = ["csv", "xlsx", "parquet", "feather", "arrow"]
+COLUMNAR_EXTENSIONS = (".parquet", ".feather", ".arrow")
+
+CONVERSION_FORMATS = {
+    "CSV": (".csv", "text/csv"),
+    "Excel": (".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "Parquet": (".parquet", "application/vnd.apache.parquet"),
+    "Feather": (".feather", "application/vnd.apache.arrow.file"),
+}
+
+
+def is_columnar(file_extension):
+    return file_extension in COLUMNAR_EXTENSIONS
+
+
+def read_columns(file, file_extension):
+    # Only the schema is decoded, no column data.
+    file.seek(0)
+    if file_extension == ".parquet":
+        names = pq.ParquetFile(file).schema_arrow.names
+    else:
+        names = ipc.open_file(file).schema.names
+    file.seek(0)
+    return [name for name in names if not name.startswith("__index_level_")]
+
+
+def read_frame(file, file_extension, columns=None):
+    file.seek(0)
+    if file_extension == ".csv":
+        return pd.read_csv(file, usecols=columns)
+    if file_extension == ".xlsx":
+        return pd.read_excel(file, usecols=columns)
+    if file_extension == ".parquet":
+        return pd.read_parquet(file, columns=columns)
+    if file_extension in (".feather", ".arrow"):
+        return pd.read_feather(file, columns=columns)
+    raise ValueError(f"Unsupported file format: {file_extension}")
+
+
+def write_frame(df, buffer, conversion_type):
+    if conversion_type == "CSV":
+        df.to_csv(buffer, index=False)
+    elif conversion_type == "Excel":
+        df.to_excel(buffer, index=False)
+    elif conversion_type == "Parquet":
+        df.to_parquet(buffer, index=False, compression="zstd")
+    elif conversion_type == "Feather":
+        # Feather only stores a default RangeIndex
+        df.reset_index(drop=True).to_feather(buffer, compression="zstd")
+    else:
+        raise ValueError(f"Unsupported conversion type: {conversion_type}")
+    return CONVERSION_FORMATS[conversion_type]
@@ -0,0 +1,111 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_MB = 1024
+HASH_BLOCK_SIZE = 8 * 1024 * 1024
+
+
+def content_digest(file):
+    # Reads the whole file, so callers keep the result per upload
+    digest = hashlib.blake2b(digest_size=16)
+    file.seek(0)
+    for block in iter(lambda: file.read(HASH_BLOCK_SIZE), b""):
+        digest.update(block)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def derived_key(digest, *extra):
+    # Key for the file with this content digest, loaded with these options
+    key = hashlib.blake2b(digest.encode(), digest_size=16)
+    for part in extra:
+        key.update(repr(part).encode())
+    return key.hexdigest()
+
+
+def content_key(file, *extra):
+    return derived_key(content_digest(file), *extra)
+
+
+def frame_size(df):
+    return int(df.memory_usage(deep=True).sum())
+
+
+class FrameCache:
+    # Frames are shared between reruns and sessions, so callers must treat
+    # them as read-only and never modify them in place.
+
+    def __init__(self, max_mb=DEFAULT_MAX_MB):
+        self.max_bytes = max_mb * 1024 * 1024
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.entries
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, df):
+        size = frame_size(df)
+        with self.lock:
+            if key in self.entries:
+                self.total_bytes -= self.entries.pop(key)[1]
+            if size > self.max_bytes:
+                return df
+            self.entries[key] = (df, size)
+            self.total_bytes += size
+            self._evict()
+        return df
+
+    def resize(self, max_mb):
+        with self.lock:
+            self.max_bytes = max_mb * 1024 * 1024
+            self._evict()
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "used_mb": self.total_bytes / (1024 * 1024),
+                "max_mb": self.max_bytes / (1024 * 1024),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes and self.entries:
+            _, (_, size) = self.entries.popitem(last=False)
+            self.total_bytes -= size
+            self.evictions += 1
+
+
+frame_cache = FrameCache()
+
+
+def load_cached(file, loader, *extra, digest=None):
+    # digest is the file's content_digest() when the caller already has it
+    key = derived_key(digest or content_digest(file), *extra)
+    df = frame_cache.get(key)
+    if df is None:
+        df = frame_cache.put(key, loader(file))
+    return df, key
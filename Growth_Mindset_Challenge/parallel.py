@@ -0,0 +1,80 @@
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from io import BytesIO
+
+from compact import compact_frame
+from engine import run_stages, timed
+from formats import read_frame, write_frame
+
+DEFAULT_WORKERS = os.cpu_count() or 1
+
+
+def parse_file(data, file_extension, compact=False):
+    df = read_frame(BytesIO(data), file_extension)
+    if compact:
+        return compact_frame(df)
+    return df, None
+
+
+def convert_file(name, data, file_extension, conversion_type, drop_duplicates=False, fill_missing_values=False):
+    started = time.perf_counter()
+    timings = {}
+    with timed(timings, "load"):
+        df, _ = parse_file(data, file_extension)
+    rows_in = len(df)
+    df = run_stages(df, timings, drop_duplicates, fill_missing_values)
+    buffer = BytesIO()
+    with timed(timings, "convert"):
+        new_extension, mime_type = write_frame(df, buffer, conversion_type)
+    return {
+        "file_name": os.path.splitext(name)[0] + new_extension,
+        "data": buffer.getvalue(),
+        "mime": mime_type,
+        "rows_in": rows_in,
+        "rows_out": len(df),
+        "timings": timings,
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def run_parallel(func, jobs, max_workers=DEFAULT_WORKERS, on_done=None):
+    # jobs maps a name to the argument tuple for func. Failures are
+    # returned per job instead of aborting the whole batch.
+    results = {}
+    errors = {}
+    with ProcessPoolExecutor(max_workers=max(1, min(max_workers, len(jobs) or 1))) as pool:
+        futures = {pool.submit(func, *args): name for name, args in jobs.items()}
+        for done, future in enumerate(as_completed(futures), start=1):
+            name = futures[future]
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                errors[name] = str(e)
+            if on_done:
+                on_done(name, done, len(jobs), name in results)
+    return results, errors
+
+
+def unique_name(name, used):
+    # x.csv, then x (1).csv, x (2).csv, ... for names already in used
+    stem, extension = os.path.splitext(name)
+    candidate, n = name, 0
+    while candidate.lower() in used:
+        n += 1
+        candidate = f"{stem} ({n}){extension}"
+    used.add(candidate.lower())
+    return candidate
+
+
+def zip_outputs(results):
+    # Uploads can share a name, and x.csv and x.xlsx both become x.csv,
+    # so every archive entry gets a name of its own
+    buffer = BytesIO()
+    used = set()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for _, result in sorted(results.items()):
+            archive.writestr(unique_name(result["file_name"], used), result["data"])
+    buffer.seek(0)
+    return buffer
@@ -0,0 +1,59 @@
+import hashlib
+
+from cleaning import remove_duplicates, fill_missing
+from dedupe import drop_fingerprint_duplicates
+from frame_cache import frame_cache
+
+# A pipeline is a list of step tuples such as ("dedupe",), ("fill_mean",),
+# ("fingerprint_dedupe", keys, fold_case, fold_whitespace) or
+# ("select", ("col_a", "col_b")). Every prefix of a pipeline is cached,
+# so appending a step only computes that step.
+DEDUPE_STEPS = ("dedupe", "fingerprint_dedupe")
+STEP_LABELS = {
+    "dedupe": "Remove duplicates",
+    "fingerprint_dedupe": "Remove fuzzy duplicates",
+    "fill_mean": "Fill missing values",
+    "select": "Select columns",
+}
+
+
+def apply_step(df, step):
+    name, *args = step
+    if name == "dedupe":
+        return remove_duplicates(df)
+    if name == "fingerprint_dedupe":
+        keys, fold_case, fold_whitespace = args
+        return drop_fingerprint_duplicates(df, [key for key in keys if key in df.columns], fold_case, fold_whitespace)
+    if name == "fill_mean":
+        return fill_missing(df)
+    if name == "select":
+        return df[[column for column in args[0] if column in df.columns]]
+    raise ValueError(f"Unknown pipeline step: {name}")
+
+
+def describe_step(step):
+    label = STEP_LABELS.get(step[0], step[0])
+    if step[0] == "select":
+        label += f" ({len(step[1])})"
+    return label
+
+
+def stage_key(base_key, steps):
+    return base_key + ":" + hashlib.blake2b(repr(steps).encode(), digest_size=8).hexdigest()
+
+
+def run_pipeline(df, base_key, steps, cache=frame_cache):
+    steps = [tuple(step) for step in steps]
+    start = 0
+    for i in range(len(steps), 0, -1):
+        key = stage_key(base_key, steps[:i])
+        if key in cache:
+            cached = cache.get(key)
+            if cached is not None:
+                df, start = cached, i
+                break
+
+    for i in range(start, len(steps)):
+        df = apply_step(df, steps[i])
+        cache.put(stage_key(base_key, steps[:i + 1]), df)
+    return df, len(steps) - start
@@ -0,0 +1,156 @@
+import numpy as np
+import pandas as pd
+
+from dedupe import row_fingerprints, drop_duplicates_out_of_core
+
+SAMPLE_ROWS = 1000
+MIN_CHUNK_ROWS = 1000
+# Each chunk is copied a few times while it is cleaned and written out,
+# so only a fraction of the ceiling is handed to the parser.
+COPY_OVERHEAD = 4
+# When removing duplicates this share of the ceiling is kept for the
+# fingerprints of the rows seen so far, 8 bytes per distinct row
+FINGERPRINT_SHARE = 0.25
+FINGERPRINT_BYTES = 8
+ESTIMATE_BYTES = 1024 * 1024
+
+
+def rewind(file):
+    if hasattr(file, "seek"):
+        file.seek(0)
+    return file
+
+
+def chunk_rows_for_ceiling(file, memory_limit_mb, remove_duplicates=False):
+    sample = pd.read_csv(rewind(file), nrows=SAMPLE_ROWS)
+    rewind(file)
+    if sample.empty:
+        return MIN_CHUNK_ROWS
+    bytes_per_row = sample.memory_usage(deep=True, index=False).sum() / len(sample)
+    budget = memory_limit_mb * 1024 * 1024 / COPY_OVERHEAD
+    if remove_duplicates:
+        budget *= 1 - FINGERPRINT_SHARE
+    return max(MIN_CHUNK_ROWS, int(budget // max(bytes_per_row, 1)))
+
+
+def estimate_rows(file):
+    # From the line length in the first megabyte. Quoted line breaks make
+    # it an overestimate, which is the safe side for a memory budget.
+    rewind(file)
+    head = file.read(ESTIMATE_BYTES)
+    size = file.seek(0, 2)
+    rewind(file)
+    lines = head.count(b"\n" if isinstance(head, bytes) else "\n")
+    if not lines:
+        return 1
+    return int(size * lines / len(head)) + 1
+
+
+def fingerprints_fit(file, memory_limit_mb):
+    # Whether one fingerprint per row fits in the ceiling's share for them
+    budget = memory_limit_mb * 1024 * 1024 * FINGERPRINT_SHARE
+    return estimate_rows(file) * FINGERPRINT_BYTES <= budget
+
+
+def read_csv_chunks(file, chunk_rows, columns=None):
+    return pd.read_csv(rewind(file), chunksize=chunk_rows, usecols=columns)
+
+
+def preview_csv(file, rows=5):
+    preview = pd.read_csv(rewind(file), nrows=rows)
+    rewind(file)
+    return preview
+
+
+def drop_duplicate_chunks(chunks, subset=None, fold_case=False, fold_whitespace=False):
+    # Only one 64-bit hash per distinct row is kept, never the rows
+    # themselves, in a sorted array that new hashes are binary-searched in
+    # and merged into.
+    seen = np.empty(0, dtype=np.uint64)
+    for chunk in chunks:
+        fingerprints = row_fingerprints(chunk, subset, fold_case, fold_whitespace)
+        unique, first = np.unique(fingerprints, return_index=True)
+        positions = np.searchsorted(seen, unique)
+        found = positions < len(seen)
+        found[found] = seen[positions[found]] == unique[found]
+        keep = np.zeros(len(chunk), dtype=bool)
+        keep[first[~found]] = True
+        seen = np.insert(seen, positions[~found], unique[~found])
+        yield chunk[keep]
+
+
+def column_means(chunks):
+    sums = None
+    counts = None
+    for chunk in chunks:
+        numeric = chunk.select_dtypes(include=["number"])
+        if sums is None:
+            sums, counts = numeric.sum(), numeric.count()
+        else:
+            sums = sums.add(numeric.sum(), fill_value=0)
+            counts = counts.add(numeric.count(), fill_value=0)
+    if sums is None:
+        return pd.Series(dtype="float64")
+    return sums / counts
+
+
+def fill_missing_chunks(chunks, means):
+    for chunk in chunks:
+        columns = [column for column in means.index if column in chunk.columns]
+        if columns:
+            chunk = chunk.copy()
+            chunk[columns] = chunk[columns].fillna(means[columns])
+        yield chunk
+
+
+def select_chunks(chunks, columns):
+    for chunk in chunks:
+        yield chunk[columns]
+
+
+def clean_csv_chunks(file, chunk_rows, columns=None, remove_duplicates=False, fill_missing=False,
+                     dedupe_keys=None, fold_case=False, fold_whitespace=False, out_of_core=False,
+                     memory_limit_mb=None):
+    header = list(preview_csv(file, rows=0).columns)
+    if remove_duplicates and memory_limit_mb is not None and not fingerprints_fit(file, memory_limit_mb):
+        # The fingerprints count against the ceiling too; when they may
+        # not fit they go to disk
+        out_of_core = True
+    missing = [key for key in dedupe_keys or [] if key not in header]
+    if missing:
+        raise ValueError(f"Duplicate key columns not in the file: {', '.join(map(str, missing))}")
+    # Duplicates are found on the key columns, or on every column, even
+    # when those are not exported. Columns are selected afterwards.
+    read_columns = columns
+    if columns is not None and remove_duplicates:
+        read_columns = list(columns) + [key for key in dedupe_keys if key not in columns] if dedupe_keys else None
+
+    def deduped():
+        if not remove_duplicates:
+            return read_csv_chunks(file, chunk_rows, read_columns)
+        if out_of_core:
+            # Fingerprints are spilled to disk instead of kept in a set
+            return drop_duplicates_out_of_core(lambda: read_csv_chunks(file, chunk_rows, read_columns),
+                                               dedupe_keys, fold_case, fold_whitespace)
+        return drop_duplicate_chunks(read_csv_chunks(file, chunk_rows, read_columns), dedupe_keys, fold_case, fold_whitespace)
+
+    def source():
+        if read_columns is columns:
+            return deduped()
+        return select_chunks(deduped(), [column for column in header if column in columns])
+
+    if not fill_missing:
+        return source()
+    # Means need a full first pass before any chunk can be filled.
+    means = column_means(source())
+    return fill_missing_chunks(source(), means)
+
+
+def write_csv_chunks(chunks, buffer):
+    rows = 0
+    header = True
+    for chunk in chunks:
+        chunk.to_csv(buffer, index=False, header=header)
+        header = False
+        rows += len(chunk)
+    return rows
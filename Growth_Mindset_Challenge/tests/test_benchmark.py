@@ -0,0 +1,33 @@
+import json
+
+import pytest
+
+from benchmark import compare, generate_frame
+
+PARAMS = {"dup_ratio": 0.3, "null_ratio": 0.05, "seed": 42}
+
+
+@pytest.mark.parametrize("dup_ratio", [0.0, 0.1, 0.3, 0.6])
+def test_duplicate_ratio_is_exact(dup_ratio):
+    df = generate_frame(10_000, dup_ratio, 0.05, 42)
+    assert len(df) - len(df.drop_duplicates()) == int(10_000 * dup_ratio)
+
+
+def baseline(tmp_path, params, seconds=1.0, peak=100.0):
+    path = tmp_path / "baseline.json"
+    record = {"format": "csv", "rows": 10, "run": 0, "stage": "read", "seconds": seconds, "peak_rss_mb": peak}
+    path.write_text(json.dumps({"params": params, "records": [record]}))
+    return str(path), record
+
+
+def test_compare_refuses_different_params(tmp_path):
+    path, record = baseline(tmp_path, dict(PARAMS, seed=1))
+    with pytest.raises(ValueError):
+        compare([record], PARAMS, path, 0.2)
+
+
+def test_compare_checks_time_and_memory(tmp_path):
+    path, record = baseline(tmp_path, PARAMS)
+    assert compare([record], PARAMS, path, 0.2) == []
+    regressions = compare([dict(record, peak_rss_mb=200.0)], PARAMS, path, 0.2)
+    assert regressions == [(("csv", 10, "read"), "peak_rss_mb", 100.0, 200.0)]
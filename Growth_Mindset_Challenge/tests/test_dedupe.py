@@ -0,0 +1,51 @@
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dedupe import drop_fingerprint_duplicates, row_fingerprints
+from streaming import clean_csv_chunks
+
+
+def test_large_integers_are_not_merged():
+    df = pd.DataFrame({"id": [9007199254740993, 9007199254740992]})
+    assert len(drop_fingerprint_duplicates(df)) == 2
+
+
+def test_whole_floats_match_integers():
+    ints = row_fingerprints(pd.DataFrame({"a": [1, 2]}))
+    floats = row_fingerprints(pd.DataFrame({"a": [1.0, 2.0]}))
+    with_nulls = row_fingerprints(pd.DataFrame({"a": [1.0, np.nan]}))
+    assert (ints == floats).all()
+    assert ints[0] == with_nulls[0]
+
+
+def test_fractional_floats_stay_distinct():
+    df = pd.DataFrame({"a": [1.0, 1.5, 1]})
+    assert drop_fingerprint_duplicates(df)["a"].tolist() == [1.0, 1.5]
+
+
+def test_null_is_not_zero():
+    df = pd.DataFrame({"a": [0.0, np.nan, None]})
+    assert len(drop_fingerprint_duplicates(df)) == 2
+
+
+def test_fold_case_and_whitespace():
+    df = pd.DataFrame({"name": ["Ada  Lovelace", " ada lovelace", "Ada"]})
+    assert len(drop_fingerprint_duplicates(df)) == 3
+    assert len(drop_fingerprint_duplicates(df, fold_case=True, fold_whitespace=True)) == 2
+
+
+@pytest.mark.parametrize("out_of_core", [False, True])
+def test_dedupe_keys_outside_selected_columns(out_of_core):
+    file = StringIO("key,value\n1,a\n1,b\n2,c\n")
+    chunks = clean_csv_chunks(file, 2, ["value"], remove_duplicates=True, dedupe_keys=["key"], out_of_core=out_of_core)
+    result = pd.concat(list(chunks))
+    assert list(result.columns) == ["value"]
+    assert result["value"].tolist() == ["a", "c"]
+
+
+def test_unknown_dedupe_key():
+    with pytest.raises(ValueError, match="missing"):
+        clean_csv_chunks(StringIO("a,b\n1,2\n"), 2, ["a"], remove_duplicates=True, dedupe_keys=["missing"])
@@ -0,0 +1,52 @@
+import os
+
+import pandas as pd
+import pytest
+
+from cli import main
+from engine import plan_outputs, process_file
+
+
+def write_csv(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def test_same_stem_different_extension_collides(tmp_path):
+    files = [str(tmp_path / "in" / "x.csv"), str(tmp_path / "in" / "x.xlsx")]
+    with pytest.raises(ValueError, match="both be written"):
+        plan_outputs(files, str(tmp_path / "in"), str(tmp_path / "out"), "CSV")
+
+
+def test_recursive_keeps_subdirectories(tmp_path):
+    input_dir = tmp_path / "in"
+    write_csv(str(input_dir / "a" / "data.csv"), "x\n1\n")
+    write_csv(str(input_dir / "b" / "data.csv"), "x\n2\n")
+    assert main([str(input_dir), str(tmp_path / "out"), "--recursive", "--workers", "1"]) == 0
+    assert pd.read_csv(tmp_path / "out" / "a" / "data.csv")["x"].tolist() == [1]
+    assert pd.read_csv(tmp_path / "out" / "b" / "data.csv")["x"].tolist() == [2]
+
+
+def test_cli_refuses_colliding_outputs(tmp_path):
+    input_dir = tmp_path / "in"
+    write_csv(str(input_dir / "x.csv"), "a\n1\n")
+    pd.DataFrame({"a": [2]}).to_parquet(input_dir / "x.parquet")
+    assert main([str(input_dir), str(tmp_path / "out"), "--workers", "1"]) == 1
+    assert not (tmp_path / "out" / "x.csv").exists()
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_dedupe_before_selecting_columns(tmp_path, stream):
+    path = str(tmp_path / "data.csv")
+    write_csv(path, "a,b\n1,x\n1,y\n1,x\n")
+    result = process_file(path, str(tmp_path / "out"), "CSV", drop_duplicates=True, columns=["a"], stream=stream)
+    assert result["rows_out"] == 2
+
+
+def test_columnar_dedupe_before_selecting_columns(tmp_path):
+    path = tmp_path / "data.parquet"
+    pd.DataFrame({"a": [1, 1, 1], "b": ["x", "y", "x"]}).to_parquet(path)
+    result = process_file(str(path), str(tmp_path / "out"), "CSV", drop_duplicates=True, columns=["a"])
+    assert result["rows_out"] == 2
+    assert list(pd.read_csv(result["output"]).columns) == ["a"]
@@ -0,0 +1,29 @@
+from io import BytesIO
+
+import pandas as pd
+
+from frame_cache import FrameCache, content_digest, content_key, derived_key, load_cached
+
+
+def test_derived_key_matches_content_key():
+    file = BytesIO(b"a,b\n1,2\n")
+    assert derived_key(content_digest(file), ".csv", None, False) == content_key(file, ".csv", None, False)
+    assert derived_key(content_digest(file), ".csv", None, True) != content_key(file, ".csv", None, False)
+
+
+def test_load_cached_uses_a_given_digest(monkeypatch):
+    import frame_cache
+
+    monkeypatch.setattr(frame_cache, "frame_cache", FrameCache())
+    file = BytesIO(b"a\n1\n")
+    digest = content_digest(file)
+    monkeypatch.setattr(frame_cache, "content_digest", lambda f: (_ for _ in ()).throw(AssertionError("rehashed")))
+    loads = []
+
+    def loader(f):
+        loads.append(f)
+        return pd.read_csv(f)
+
+    first, key = load_cached(file, loader, ".csv", digest=digest)
+    second, same_key = load_cached(file, loader, ".csv", digest=digest)
+    assert key == same_key and second is first and len(loads) == 1
@@ -0,0 +1,21 @@
+import zipfile
+
+from parallel import convert_file, run_parallel, zip_outputs
+
+
+def test_zip_entries_get_unique_names():
+    results = {
+        0: {"file_name": "x.csv", "data": b"a\n1\n"},
+        1: {"file_name": "x.csv", "data": b"a\n2\n"},
+        2: {"file_name": "X.csv", "data": b"a\n3\n"},
+    }
+    with zipfile.ZipFile(zip_outputs(results)) as archive:
+        assert archive.namelist() == ["x.csv", "x (1).csv", "X (2).csv"]
+        assert archive.read("x (1).csv") == b"a\n2\n"
+
+
+def test_jobs_with_the_same_name_are_kept_apart():
+    jobs = {index: ("x.csv", data, ".csv", "CSV") for index, data in enumerate([b"a\n1\n", b"a\n2\n"])}
+    results, errors = run_parallel(convert_file, jobs, max_workers=2)
+    assert not errors
+    assert [results[index]["data"].decode().split() for index in (0, 1)] == [["a", "1"], ["a", "2"]]
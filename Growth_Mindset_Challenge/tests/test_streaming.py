@@ -0,0 +1,51 @@
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+import streaming
+from streaming import chunk_rows_for_ceiling, clean_csv_chunks, drop_duplicate_chunks, estimate_rows, fingerprints_fit
+
+
+def csv_file(df):
+    buffer = BytesIO()
+    df.to_csv(buffer, index=False)
+    buffer.seek(0)
+    return buffer
+
+
+def test_streamed_dedupe_matches_pandas():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"a": rng.integers(0, 50, 5000), "b": rng.integers(0, 5, 5000)})
+    chunks = [df.iloc[start:start + 700] for start in range(0, len(df), 700)]
+    result = pd.concat(list(drop_duplicate_chunks(iter(chunks))))
+    expected = df.drop_duplicates()
+    assert result.index.tolist() == expected.index.tolist()
+
+
+def test_estimate_rows():
+    file = csv_file(pd.DataFrame({"a": range(10_000)}))
+    assert 9_000 <= estimate_rows(file) <= 11_000
+    assert file.tell() == 0
+
+
+def test_fingerprints_are_charged_against_the_ceiling():
+    file = csv_file(pd.DataFrame({"a": range(200_000)}))
+    assert fingerprints_fit(file, 16)
+    assert not fingerprints_fit(file, 1)
+    assert chunk_rows_for_ceiling(file, 64, remove_duplicates=True) < chunk_rows_for_ceiling(file, 64)
+
+
+def test_large_files_spill_fingerprints_to_disk(monkeypatch):
+    calls = []
+    original = streaming.drop_duplicates_out_of_core
+
+    def spy(*args, **kwargs):
+        calls.append(True)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(streaming, "drop_duplicates_out_of_core", spy)
+    df = pd.DataFrame({"a": list(range(100_000)) * 2})
+    result = pd.concat(list(clean_csv_chunks(csv_file(df), 50_000, remove_duplicates=True, memory_limit_mb=1)))
+    assert calls
+    assert len(result) == 100_000
@@ -1,33 +1,138 @@
 import os
+import time
+import numpy as np
+import pandas as pd
 import streamlit as st
 from dotenv import load_dotenv
 from google import genai
+from explanation_cache import explanation_cache, cache_key
+from explainer import LocalClient, ExplanationWorker, stream_text
+from client_pool import shared_pool
+from units import DIMENSIONS, unit_names, convert, convert_array
 
  
 load_dotenv()
 
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+GEMINI_MODEL = "gemini-2.0-flash"
+EXPLANATION_TIMEOUT = float(os.getenv("EXPLANATION_TIMEOUT", 20))
+CLIENT_POOL_SIZE = int(os.getenv("GEMINI_POOL_SIZE", 4))
 
  
-client = genai.Client(api_key=GEMINI_API_KEY)
+# EXPLANATION_BACKEND=local swaps Gemini for an offline stand-in
+# Clients are pooled per process instead of being built on every rerun
+if os.getenv("EXPLANATION_BACKEND") == "local":
+    client_pool = shared_pool("local", LocalClient, max_size=CLIENT_POOL_SIZE)
+else:
+    client_pool = shared_pool(
+        ("gemini", GEMINI_API_KEY), lambda: genai.Client(api_key=GEMINI_API_KEY),
+        max_size=CLIENT_POOL_SIZE,
+        health_check=lambda client: client.models.get(model=GEMINI_MODEL) is not None
+    )
 
  
-def get_ai_explanation(conversion_type, input_value, result):
-    prompt = f"Explain how {input_value} {conversion_type} is converted to {result} in a simple way."
-
+def build_prompt(conversion_type, input_value, result, from_unit, to_unit, share_by_unit_pair=False):
+    if share_by_unit_pair:
+        # One explanation per unit pair, reused for every value
+        return f"Explain in a simple way how to convert {conversion_type} from {from_unit} to {to_unit}, with the formula and one worked example."
+    return f"Explain how {input_value} {from_unit} is converted to {result} {to_unit} ({conversion_type}) in a simple way."
+
+
+def show_ai_explanation(placeholder, conversion_type, input_value, result, from_unit, to_unit, share_by_unit_pair=False):
+    prompt = build_prompt(conversion_type, input_value, result, from_unit, to_unit, share_by_unit_pair)
+    key = cache_key(prompt)
+    cached = explanation_cache.get(key)
+    if cached:
+        placeholder.info(f"AI Explanation: {cached}")
+        return
+
+    # The request runs on a background thread and the text is shown as it
+    # arrives. A rerun from new input stops the script, and the finally
+    # block cancels the request that is no longer needed. The worker hands
+    # the client back once its stream is closed, as suspect after an error.
     try:
-         
-        response = client.models.generate_content(
-            model="gemini-2.0-flash",  
-            contents=prompt
-        )
-        explanation = response.text.strip()
-        if not explanation:
-            explanation = "The explanation was not returned by the AI model. Please check the API configuration."
-        return explanation
+        client = client_pool.acquire(EXPLANATION_TIMEOUT)
+    except TimeoutError as e:
+        placeholder.warning(f"AI Explanation: {e}")
+        return
     except Exception as e:
-        return f"Error: {str(e)}"
+        placeholder.error(f"Error: {str(e)}")
+        return
+    worker = ExplanationWorker(
+        client.models, GEMINI_MODEL, prompt,
+        on_finish=lambda failed: client_pool.release(client, suspect=failed)
+    )
+    try:
+        worker.start()
+    except BaseException:
+        client_pool.release(client, suspect=True)
+        raise
+    explanation = ""
+    try:
+        placeholder.info("AI Explanation: ...")
+        for piece in stream_text(worker, EXPLANATION_TIMEOUT):
+            explanation += piece
+            placeholder.info(f"AI Explanation: {explanation}▌")
+    except TimeoutError as e:
+        placeholder.warning(f"AI Explanation: {explanation} ({e})")
+        return
+    except RuntimeError as e:
+        placeholder.error(f"Error: {str(e)}")
+        return
+    finally:
+        worker.cancel()
+
+    explanation = explanation.strip()
+    if not explanation:
+        placeholder.warning("The explanation was not returned by the AI model. Please check the API configuration.")
+        return
+    explanation_cache.put(key, explanation)
+    placeholder.info(f"AI Explanation: {explanation}")
+
+
+def show_csv_converter(conversion_type):
+    units = unit_names(conversion_type)
+    uploaded_file = st.file_uploader("Upload a CSV file", type=["csv"])
+    if uploaded_file is None:
+        st.info("Upload a CSV file with a column of values to convert.")
+        return
+
+    df = pd.read_csv(uploaded_file)
+    numeric_columns = list(df.select_dtypes(include="number").columns)
+    if not numeric_columns:
+        st.error("The file has no numeric columns to convert.")
+        return
+
+    value_column = st.selectbox("Column to convert", numeric_columns)
+    unit_source = st.radio("Source unit", ["Same for every row", "From a column"], horizontal=True)
+    col1, col2 = st.columns(2)
+    with col1:
+        if unit_source == "From a column":
+            from_units = df[st.selectbox("Unit column", [column for column in df.columns if column != value_column])]
+        else:
+            from_units = st.selectbox("From", units)
+    with col2:
+        to_unit = st.selectbox("To", units)
+
+    # The whole column is converted in one NumPy operation
+    started = time.perf_counter()
+    try:
+        converted = convert_array(df[value_column].to_numpy(dtype=float, na_value=np.nan), conversion_type, from_units, to_unit)
+    except KeyError as e:
+        st.error(e.args[0])
+        return
+    elapsed = time.perf_counter() - started
+
+    df[f"{value_column} ({to_unit})"] = converted
+    st.success(f"Converted {len(df):,} values in {elapsed * 1000:.1f} ms")
+    st.dataframe(df.head(100))
+    st.download_button(
+        label="Download converted CSV",
+        data=df.to_csv(index=False),
+        file_name=uploaded_file.name.replace(".csv", "_converted.csv"),
+        mime="text/csv"
+    )
 
  
 st.title("Unit Converter with AI Explanations")
@@ -108,76 +213,41 @@ st.markdown("<h1>Unit Converter</h1>", unsafe_allow_html=True)
 st.write("Easily convert between units of measurement with a modern design.")
 
 
-conversion_type = st.sidebar.selectbox("Choose Conversion Type to Convert", ["Length", "Weight", "Temperature"])
-value = st.number_input("Enter Value", min_value=0.0, format="%.2f")
+conversion_type = st.sidebar.selectbox("Choose Conversion Type to Convert", list(DIMENSIONS))
+mode = st.sidebar.radio("Mode", ["Single Value", "CSV Column"])
+share_by_unit_pair = st.sidebar.checkbox("Reuse one explanation per unit pair")
 
-col1, col2 = st.columns(2)
+result = None
+if mode == "CSV Column":
+    show_csv_converter(conversion_type)
+else:
+    value = st.number_input("Enter Value", min_value=0.0, format="%.2f")
 
+    col1, col2 = st.columns(2)
 
-result = None 
-if conversion_type == "Length":
-    with col1:
-        from_unit = st.selectbox("From", ["Meters", "Kilometers", "Millimeters", "Miles", "Yards", "Centimeters", "Feet", "Inches"])
-    with col2:
-        to_unit = st.selectbox("To", ["Meters", "Kilometers", "Millimeters", "Miles", "Yards", "Centimeters", "Feet", "Inches"])
-        
-    conversion_factors = {
-        "Meters-Kilometers": 0.001, "Kilometers-Meters": 1000,
-        "Meters-Millimeters": 1000, "Millimeters-Meters": 0.001,
-        "Meters-Miles": 0.000621371, "Miles-Meters": 1609.34,
-        "Meters-Yards": 1.09361, "Yards-Meters": 0.9144,
-        "Meters-Centimeters": 100, "Centimeters-Meters": 0.01,
-        "Meters-Feet": 3.28084, "Feet-Meters": 0.3048,
-        "Meters-Inches": 39.3701, "Inches-Meters": 0.0254,
-        "Inches-Feet": 1 / 12, "Feet-Inches": 12
-    }
-    key = f"{from_unit}-{to_unit}"
-    result = value * conversion_factors.get(key, 1)
 
-elif conversion_type == "Weight":
+    units = unit_names(conversion_type)
     with col1:
-        from_unit = st.selectbox("From", ["Kilograms", "Grams", "Milligrams", "Pounds", "Ounces"])
+        from_unit = st.selectbox("From", units)
     with col2:
-        to_unit = st.selectbox("To", ["Kilograms", "Grams", "Milligrams", "Pounds", "Ounces"])
-        
-    conversion_factors = {
-        "Kilograms-Grams": 1000, "Grams-Kilograms": 0.001,
-        "Kilograms-Milligrams": 1000000, "Milligrams-Kilograms": 0.000001,
-        "Kilograms-Pounds": 2.20462, "Pounds-Kilograms": 0.453592,
-        "Kilograms-Ounces": 35.274, "Ounces-Kilograms": 0.0283495
-    }
-    key = f"{from_unit}-{to_unit}"
-    result = value * conversion_factors.get(key, 1)
+        to_unit = st.selectbox("To", units)
 
-elif conversion_type == "Temperature":
-    with col1:
-        from_unit = st.selectbox("From", ["Celsius", "Fahrenheit", "Kelvin"])
-    with col2:
-        to_unit = st.selectbox("To", ["Celsius", "Fahrenheit", "Kelvin"])
-        
-    if from_unit == "Celsius" and to_unit == "Fahrenheit":
-        result = (value * 1.8) + 32
-    elif from_unit == "Fahrenheit" and to_unit == "Celsius":
-        result = (value - 32) / 1.8
-    elif from_unit == "Celsius" and to_unit == "Kelvin":
-        result = value + 273.15
-    elif from_unit == "Kelvin" and to_unit == "Celsius":
-        result = value - 273.15
-    elif from_unit == "Fahrenheit" and to_unit == "Kelvin":
-        result = (value - 32) / 1.8 + 273.15
-    elif from_unit == "Kelvin" and to_unit == "Fahrenheit":
-        result = (value - 273.15) * 1.8 + 32
-    else:
-        result = value
+    result = convert(value, conversion_type, from_unit, to_unit)
 
 
 if result is not None:
     st.markdown(f"<div class='result-box'>{value} {from_unit} is equal to {result:.2f} {to_unit}</div>", unsafe_allow_html=True)
     
-    explanation = get_ai_explanation(conversion_type, value, result)
-    st.info(f"AI Explanation: {explanation}")
-else:
-    st.warning("Please enter a valid input and ensure the conversion type is selected.")
+    explanation_box = st.empty()
 
 # Footer
 st.markdown("<div class='footer'>Developed with ❤️ by <a href='https://github.com/Ahmed-Raza0' target='_blank' style='color: #ff9f43; text-decoration: none;'>Ahmed Raza</a> using Streamlit</div>", unsafe_allow_html=True)
+
+# The explanation is filled in last, once the rest of the page is shown
+if result is not None:
+    show_ai_explanation(explanation_box, conversion_type, value, round(result, 2), from_unit, to_unit, share_by_unit_pair)
+
+    cache_stats = explanation_cache.stats()
+    st.sidebar.caption(f"Explanation cache: {cache_stats['entries']} entries, {cache_stats['hits']} hits, {cache_stats['misses']} misses")
+    pool_stats = client_pool.stats()
+    st.sidebar.caption(f"AI clients: {pool_stats['created']} created, {pool_stats['reused']} reused, {pool_stats['in_use']} in use")
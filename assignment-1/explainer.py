@@ -0,0 +1,89 @@
+import queue
+import threading
+import time
+
+
+class LocalChunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class LocalModels:
+    # Offline stand-in for client.models that streams a canned answer word
+    # by word, so the app can be tried and tested without an API key.
+
+    def __init__(self, delay=0.03):
+        self.delay = delay
+
+    def generate_content_stream(self, model, contents):
+        text = (
+            f"(Offline explanation) You asked: \"{contents}\" "
+            "Every unit is defined relative to a base unit, so the value is first converted "
+            "to the base unit and then from the base unit to the target unit. "
+            "For temperatures an offset is applied as well as a scale factor."
+        )
+        for word in text.split(" "):
+            time.sleep(self.delay)
+            yield LocalChunk(word + " ")
+
+    def generate_content(self, model, contents):
+        return LocalChunk("".join(chunk.text for chunk in self.generate_content_stream(model, contents)))
+
+
+class LocalClient:
+    def __init__(self, delay=0.03):
+        self.models = LocalModels(delay)
+
+
+class ExplanationWorker(threading.Thread):
+    # Fetches a streamed response on a background thread and hands the text
+    # pieces over through a queue. cancel() stops it between pieces.
+    # on_finish(failed) runs on this thread once the stream is closed, so
+    # the client can go back to its pool only when nothing uses it anymore.
+
+    def __init__(self, models, model_name, prompt, on_finish=None):
+        super().__init__(daemon=True)
+        self.models = models
+        self.model_name = model_name
+        self.prompt = prompt
+        self.on_finish = on_finish
+        self.pieces = queue.Queue()
+        self.cancelled = threading.Event()
+
+    def run(self):
+        failed = False
+        stream = None
+        try:
+            stream = self.models.generate_content_stream(model=self.model_name, contents=self.prompt)
+            for chunk in stream:
+                if self.cancelled.is_set():
+                    return
+                if chunk.text:
+                    self.pieces.put(("text", chunk.text))
+            self.pieces.put(("done", None))
+        except Exception as e:
+            failed = True
+            self.pieces.put(("error", str(e)))
+        finally:
+            if hasattr(stream, "close"):
+                stream.close()
+            if self.on_finish:
+                self.on_finish(failed)
+
+    def cancel(self):
+        self.cancelled.set()
+
+
+def stream_text(worker, timeout):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            kind, value = worker.pieces.get(timeout=max(0.0, deadline - time.monotonic()))
+        except queue.Empty:
+            worker.cancel()
+            raise TimeoutError(f"No complete answer within {timeout:.0f} seconds")
+        if kind == "done":
+            return
+        if kind == "error":
+            raise RuntimeError(value)
+        yield value
@@ -0,0 +1,79 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from decimal import Decimal
+
+CACHE_PATH = os.getenv("EXPLANATION_CACHE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".explanation_cache.sqlite"))
+CACHE_TTL_SECONDS = int(os.getenv("EXPLANATION_CACHE_TTL", 7 * 24 * 3600))
+CACHE_MAX_ENTRIES = int(os.getenv("EXPLANATION_CACHE_MAX_ENTRIES", 1000))
+
+
+def normalize_prompt(prompt):
+    prompt = re.sub(r"\s+", " ", prompt.strip().lower())
+    # 5, 5.0 and 5.00 should all hit the same entry. Decimal keeps every
+    # digit, so 1234567 and 1234568 never do.
+    return re.sub(r"\d+\.\d+|\d+", lambda m: format(Decimal(m.group()).normalize(), "f"), prompt)
+
+
+def cache_key(prompt):
+    return hashlib.sha256(normalize_prompt(prompt).encode()).hexdigest()
+
+
+class ExplanationCache:
+    def __init__(self, path=CACHE_PATH, ttl_seconds=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        with closing(self.connect()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS explanations ("
+                "key TEXT PRIMARY KEY, text TEXT NOT NULL, created REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS explanations_last_used ON explanations (last_used)")
+
+    def connect(self):
+        return sqlite3.connect(self.path, timeout=5)
+
+    def get(self, key):
+        now = time.time()
+        with closing(self.connect()) as conn, conn:
+            row = conn.execute("SELECT text, created FROM explanations WHERE key = ?", (key,)).fetchone()
+            if row and now - row[1] > self.ttl_seconds:
+                conn.execute("DELETE FROM explanations WHERE key = ?", (key,))
+                row = None
+            if row:
+                conn.execute("UPDATE explanations SET last_used = ? WHERE key = ?", (now, key))
+        with self.lock:
+            if row:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return row[0] if row else None
+
+    def put(self, key, text):
+        now = time.time()
+        with closing(self.connect()) as conn, conn:
+            conn.execute("INSERT OR REPLACE INTO explanations VALUES (?, ?, ?, ?)", (key, text, now, now))
+            conn.execute("DELETE FROM explanations WHERE created < ?", (now - self.ttl_seconds,))
+            # Least recently used entries go first once the cache is full
+            conn.execute(
+                "DELETE FROM explanations WHERE key IN ("
+                "SELECT key FROM explanations ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def stats(self):
+        with closing(self.connect()) as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM explanations").fetchone()[0]
+        with self.lock:
+            return {"entries": entries, "hits": self.hits, "misses": self.misses}
+
+
+explanation_cache = ExplanationCache()
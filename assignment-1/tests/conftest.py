@@ -0,0 +1,8 @@
+import os
+import sys
+import tempfile
+
+# The app imports its modules by bare name and opens its cache on import,
+# so the cache points at a scratch file before anything is imported
+os.environ["EXPLANATION_CACHE_PATH"] = os.path.join(tempfile.mkdtemp(), "explanations.sqlite")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,31 @@
+import time
+
+from explanation_cache import ExplanationCache, cache_key, normalize_prompt
+
+
+def prompt(value, result):
+    return f"Explain how {value} Meters is converted to {result} Kilometers (Length) in a simple way."
+
+
+def test_equal_numbers_share_a_key():
+    assert cache_key(prompt("5", "0.005")) == cache_key(prompt("5.0", "0.0050")) == cache_key(prompt("5.00", "0.005"))
+    assert normalize_prompt("100.0 and 0.50") == "100 and 0.5"
+
+
+def test_different_numbers_get_different_keys():
+    assert cache_key(prompt("1234567.0", "1234.57")) != cache_key(prompt("1234568.0", "1234.57"))
+    assert cache_key(prompt("0.1234567", "1")) != cache_key(prompt("0.1234568", "1"))
+
+
+def test_whitespace_and_case_are_ignored():
+    assert cache_key("Explain  5 METERS") == cache_key("explain 5 meters ")
+
+
+def test_put_get_and_eviction(tmp_path):
+    cache = ExplanationCache(str(tmp_path / "cache.sqlite"), max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.put(key, key.upper())
+        time.sleep(0.01)
+    assert cache.get("a") is None
+    assert cache.get("c") == "C"
+    assert cache.stats() == {"entries": 2, "hits": 1, "misses": 1}
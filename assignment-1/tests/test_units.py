@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from units import DIMENSIONS, convert, convert_array, unit_names
+
+
+@pytest.mark.parametrize("dimension, from_unit, to_unit, value, expected", [
+    ("Length", "Kilometers", "Miles", 1, 0.621371),
+    ("Length", "Miles", "Kilometers", 1, 1.609344),
+    ("Length", "Feet", "Meters", 1, 0.3048),
+    ("Weight", "Grams", "Pounds", 1000, 2.204623),
+    ("Weight", "Pounds", "Ounces", 1, 16),
+    ("Temperature", "Celsius", "Fahrenheit", 100, 212),
+    ("Temperature", "Fahrenheit", "Celsius", 32, 0),
+    ("Temperature", "Fahrenheit", "Celsius", -40, -40),
+    ("Temperature", "Celsius", "Kelvin", 0, 273.15),
+    ("Temperature", "Kelvin", "Fahrenheit", 0, -459.67),
+    ("Temperature", "Fahrenheit", "Kelvin", 212, 373.15),
+    ("Area", "Acres", "Square Meters", 1, 4046.8564224),
+    ("Area", "Square Miles", "Hectares", 1, 258.9988110336),
+    ("Volume", "Gallons (US)", "Liters", 1, 3.785411784),
+    ("Speed", "Knots", "Meters per second", 1, 0.514444),
+    ("Data Size", "Mebibytes", "Kilobytes", 1, 1048.576),
+])
+def test_known_pairs(dimension, from_unit, to_unit, value, expected):
+    assert convert(value, dimension, from_unit, to_unit) == pytest.approx(expected, rel=1e-6, abs=1e-9)
+
+
+@pytest.mark.parametrize("dimension", list(DIMENSIONS))
+def test_round_trips(dimension):
+    units = unit_names(dimension)
+    for from_unit in units:
+        assert convert(12.5, dimension, from_unit, from_unit) == pytest.approx(12.5)
+        for to_unit in units:
+            there = convert(12.5, dimension, from_unit, to_unit)
+            assert convert(there, dimension, to_unit, from_unit) == pytest.approx(12.5)
+
+
+def test_convert_array_with_one_unit_each():
+    result = convert_array([0, 100, -40], "Temperature", "Celsius", "Fahrenheit")
+    np.testing.assert_allclose(result, [32, 212, -40])
+
+
+def test_convert_array_with_per_row_units():
+    values = [1, 1000, 32, 0]
+    from_units = np.array(["Celsius", "Kelvin", "Fahrenheit", "Kelvin"])
+    to_units = ["Kelvin", "Celsius", "Celsius", "Fahrenheit"]
+    result = convert_array(values, "Temperature", from_units, to_units)
+    expected = [convert(value, "Temperature", a, b) for value, a, b in zip(values, from_units, to_units)]
+    np.testing.assert_allclose(result, expected)
+    np.testing.assert_allclose(result, [274.15, 726.85, 0, -459.67], atol=1e-9)
+
+
+def test_convert_array_mixes_one_name_and_per_row_units():
+    result = convert_array([1, 2, 3], "Length", ["Kilometers", "Meters", "Miles"], "Meters")
+    np.testing.assert_allclose(result, [1000, 2, 4828.032])
+
+
+def test_unknown_unit_names_raise_key_error():
+    with pytest.raises(KeyError):
+        convert(1, "Length", "Parsecs", "Meters")
+    with pytest.raises(KeyError):
+        convert(1, "Length", "Meters", "Pounds")
+    with pytest.raises(KeyError):
+        convert(1, "Luminosity", "Meters", "Meters")
+    with pytest.raises(KeyError, match="Furlongs"):
+        convert_array([1, 2], "Length", ["Meters", "Furlongs"], "Meters")
+    with pytest.raises(KeyError, match="Stones"):
+        convert_array([1, 2], "Weight", "Grams", ["Pounds", "Stones"])
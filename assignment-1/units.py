@@ -0,0 +1,147 @@
+import numpy as np
+
+# Every unit is defined once as (factor, reference unit, offset), meaning
+# value in the reference unit = factor * value + offset. The base unit of a
+# dimension has no reference. Definitions may chain through other units
+# (Yards -> Feet -> Inches -> Meters); at import each unit is resolved to
+# the base and a full conversion matrix is built, so any pair is one lookup.
+UNIT_DEFINITIONS = {
+    "Length": {
+        "Meters": (1, None),
+        "Kilometers": (1000, "Meters"),
+        "Millimeters": (0.001, "Meters"),
+        "Miles": (1760, "Yards"),
+        "Yards": (3, "Feet"),
+        "Centimeters": (0.01, "Meters"),
+        "Feet": (12, "Inches"),
+        "Inches": (0.0254, "Meters"),
+    },
+    "Weight": {
+        "Kilograms": (1, None),
+        "Grams": (0.001, "Kilograms"),
+        "Milligrams": (0.001, "Grams"),
+        "Pounds": (0.45359237, "Kilograms"),
+        "Ounces": (1 / 16, "Pounds"),
+    },
+    "Temperature": {
+        "Celsius": (1, "Kelvin", 273.15),
+        "Fahrenheit": (5 / 9, "Celsius", -32 * 5 / 9),
+        "Kelvin": (1, None),
+    },
+    "Area": {
+        "Square Meters": (1, None),
+        "Square Kilometers": (1_000_000, "Square Meters"),
+        "Square Centimeters": (0.0001, "Square Meters"),
+        "Square Millimeters": (0.01, "Square Centimeters"),
+        "Hectares": (10_000, "Square Meters"),
+        "Acres": (4840, "Square Yards"),
+        "Square Miles": (640, "Acres"),
+        "Square Yards": (9, "Square Feet"),
+        "Square Feet": (144, "Square Inches"),
+        "Square Inches": (0.00064516, "Square Meters"),
+    },
+    "Volume": {
+        "Liters": (1, None),
+        "Milliliters": (0.001, "Liters"),
+        "Cubic Meters": (1000, "Liters"),
+        "Gallons (US)": (231, "Cubic Inches"),
+        "Quarts (US)": (0.25, "Gallons (US)"),
+        "Pints (US)": (0.5, "Quarts (US)"),
+        "Cups (US)": (0.5, "Pints (US)"),
+        "Fluid Ounces (US)": (0.125, "Cups (US)"),
+        "Cubic Feet": (1728, "Cubic Inches"),
+        "Cubic Inches": (0.016387064, "Liters"),
+    },
+    "Speed": {
+        "Meters per second": (1, None),
+        "Kilometers per hour": (1 / 3.6, "Meters per second"),
+        "Miles per hour": (0.44704, "Meters per second"),
+        "Feet per second": (0.3048, "Meters per second"),
+        "Knots": (1.852, "Kilometers per hour"),
+    },
+    "Data Size": {
+        "Bytes": (1, None),
+        "Bits": (0.125, "Bytes"),
+        "Kilobytes": (1000, "Bytes"),
+        "Megabytes": (1000, "Kilobytes"),
+        "Gigabytes": (1000, "Megabytes"),
+        "Terabytes": (1000, "Gigabytes"),
+        "Kibibytes": (1024, "Bytes"),
+        "Mebibytes": (1024, "Kibibytes"),
+        "Gibibytes": (1024, "Mebibytes"),
+        "Tebibytes": (1024, "Gibibytes"),
+    },
+}
+
+
+def resolve_to_base(definitions):
+    # Returns {unit: (scale, offset)} with base value = scale * value + offset
+    resolved = {}
+
+    def resolve(unit, path=()):
+        if unit in resolved:
+            return resolved[unit]
+        if unit in path:
+            raise ValueError(f"Circular unit definition: {' -> '.join(path + (unit,))}")
+        factor, reference, *offset = definitions[unit]
+        offset = offset[0] if offset else 0
+        if reference is None:
+            resolved[unit] = (factor, offset)
+        else:
+            ref_scale, ref_offset = resolve(reference, path + (unit,))
+            resolved[unit] = (ref_scale * factor, ref_scale * offset + ref_offset)
+        return resolved[unit]
+
+    for unit in definitions:
+        resolve(unit)
+    return resolved
+
+
+class Dimension:
+    def __init__(self, name, definitions):
+        self.name = name
+        self.units = list(definitions)
+        self.index = {unit: i for i, unit in enumerate(self.units)}
+        to_base = [resolve_to_base(definitions)[unit] for unit in self.units]
+        # to = (from_scale * value + from_offset - to_offset) / to_scale
+        self.scale = [[a_from / a_to for a_to, _ in to_base] for a_from, _ in to_base]
+        self.offset = [[(b_from - b_to) / a_to for a_to, b_to in to_base] for _, b_from in to_base]
+        self.scale_matrix = np.array(self.scale)
+        self.offset_matrix = np.array(self.offset)
+
+    def convert(self, value, from_unit, to_unit):
+        i, j = self.index[from_unit], self.index[to_unit]
+        return value * self.scale[i][j] + self.offset[i][j]
+
+    def unit_indices(self, units):
+        # A single unit name gives a scalar index, an array of names one
+        # index per element (each distinct name is only looked up once).
+        if isinstance(units, str):
+            return self.index[units]
+        names, inverse = np.unique(np.asarray(units, dtype=object).astype(str), return_inverse=True)
+        unknown = [name for name in names if name not in self.index]
+        if unknown:
+            raise KeyError(f"Unknown {self.name} units: {', '.join(unknown)}")
+        return np.array([self.index[name] for name in names], dtype=np.intp)[inverse]
+
+    def convert_array(self, values, from_units, to_units):
+        values = np.asarray(values, dtype=np.float64)
+        i, j = self.unit_indices(from_units), self.unit_indices(to_units)
+        return values * self.scale_matrix[i, j] + self.offset_matrix[i, j]
+
+
+DIMENSIONS = {name: Dimension(name, definitions) for name, definitions in UNIT_DEFINITIONS.items()}
+
+
+def unit_names(dimension):
+    return DIMENSIONS[dimension].units
+
+
+def convert(value, dimension, from_unit, to_unit):
+    return DIMENSIONS[dimension].convert(value, from_unit, to_unit)
+
+
+def convert_array(values, dimension, from_units, to_units):
+    # Vectorized form of convert(): values is array-like, and either unit
+    # may be one name or an array of names matching values.
+    return DIMENSIONS[dimension].convert_array(values, from_units, to_units)
@@ -1,8 +1,12 @@
 import streamlit as st
-from supabase import create_client, Client
 import pandas as pd
 import dotenv
-import os
+from html import escape
+from queries import PAGE_SIZE
+from book_cache import book_cache
+from bulk import DEFAULT_BATCH_SIZE, read_records, validate_records, insert_batches, export_books
+from storage import open_storage
+from io import BytesIO
 
 
 st.markdown(
@@ -63,6 +67,12 @@ st.markdown(
             width: 100%;
             margin-top: 20px;
         }
+        .book-grid {
+            display: grid;
+            grid-template-columns: repeat(3, 1fr);
+            justify-items: center;
+            column-gap: 15px;
+        }
         .book-card {
             background: rgba(255, 255, 255, 0.1);
             width: 230px; 
@@ -121,17 +131,41 @@ st.markdown(
 
 dotenv.load_dotenv()
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+storage = open_storage()
 
 st.title("📚 Personal Library Manager")
 
-def get_books():
+SEARCH_MODES = ["Instant", "Database", "Full-text (needs the fts column from schema.sql)"]
+
+PAGE_SIZES = [15, PAGE_SIZE, 60, 90]
+
+def get_books_page(search_query, cursor, search_mode=SEARCH_MODES[0], page_size=PAGE_SIZE):
+    try:
+        if search_query.strip() and search_mode == SEARCH_MODES[0]:
+            return book_cache.search(storage, search_query, cursor or 0, page_size)
+        return book_cache.page(storage, search_query, cursor, page_size, search_mode == SEARCH_MODES[2])
+    except Exception as e:
+        st.error(f"Error fetching books: {e}")
+        return [], None
+
+def book_card(book):
+    return (
+        '<div class="book-card">'
+        f"<h4>{escape(str(book.get('title', 'Unknown')))}</h4>"
+        f"<p><strong>Author:</strong> {escape(str(book.get('author', 'Unknown')))}</p>"
+        f"<p><strong>Genre:</strong> {escape(str(book.get('genre', 'Unknown')))}</p>"
+        f"<p class=\"year\"><strong>Year:</strong> {escape(str(book.get('year', 'N/A')))}</p>"
+        "</div>"
+    )
+
+def render_book_grid(books):
+    # Only the current page is rendered, as a single markdown element, so
+    # the page costs the same however large the library is
+    st.markdown(f'<div class="book-grid">{"".join(book_card(book) for book in books)}</div>', unsafe_allow_html=True)
+
+def get_titles():
     try:
-        response = supabase.table("books").select("*").execute()
-        return response.data if response.data else []
+        return book_cache.book_titles(storage)
     except Exception as e:
         st.error(f"Error fetching books: {e}")
         return []
@@ -141,52 +175,89 @@ def add_book(title, author, genre, year):
         st.error("All fields are required!")
         return
 
-    supabase.table("books").insert({
+    rows = storage.insert([{
         "title": title, "author": author, "genre": genre, "year": year
-    }).execute()
+    }])
+    book_cache.added(storage, rows)
     
     st.success(f"✅ '{title}' added successfully!")
     st.rerun()
 
 def delete_book(book_id):
-    supabase.table("books").delete().eq("id", book_id).execute()
+    storage.delete(book_id)
+    book_cache.deleted(storage, [book_id])
     st.warning(f"❌ Book with ID {book_id} deleted!")
     st.rerun()
 
+def import_books(data, file_name, batch_size):
+    try:
+        records = read_records(data, file_name)
+    except Exception as e:
+        st.error(f"Could not read {file_name}: {e}")
+        return
+    books, errors = validate_records(records)
+    if errors:
+        st.warning(f"⚠️ {len(errors)} of {len(records)} rows skipped.")
+        st.dataframe(pd.DataFrame(errors[:100]))
+    if not books:
+        st.error("No valid books to import.")
+        return
+
+    progress = st.progress(0.0, text="Importing books...")
+    stats = insert_batches(
+        storage.insert, books, batch_size, retryable=storage.retryable,
+        on_progress=lambda done, total: progress.progress(done / total, text=f"Imported {done:,} of {total:,} books")
+    )
+    book_cache.added(storage, stats["rows"], stats["writes"])
+    st.success(f"✅ Imported {stats['inserted']:,} books in {stats['batches']} batches, "
+               f"{stats['seconds']:.2f}s ({stats['rows_per_second']:,.0f} books/s, {stats['retries']} retries)")
+    for failure in stats["failed"]:
+        st.error(f"❌ Rows {failure['rows']} failed: {failure['error']}")
+
 def update_book(book_id, title, author, genre, year):
     if not title or not author or not genre or not year:
         st.error("All fields are required!")
         return
-    supabase.table("books").update({
+    rows = storage.update(book_id, {
         "title": title, "author": author, "genre": genre, "year": year
-    }).eq("id", book_id).execute()
+    })
+    book_cache.updated(storage, rows)
     st.success(f"✅ '{title}' updated successfully!")
     st.rerun()
 
-menu = st.sidebar.selectbox("Menu", ["📖 View Books", "➕ Add Book", "✏️ Update Book", "🗑️ Delete Book"])
+menu = st.sidebar.selectbox("Menu", ["📖 View Books", "➕ Add Book", "✏️ Update Book", "🗑️ Delete Book", "📦 Import / Export"])
+cache_stats = book_cache.stats()
+st.sidebar.caption(f"Cache: {cache_stats['books']} books, {cache_stats['terms']} indexed terms, {cache_stats['pages']} pages | {cache_stats['hits']} hits, {cache_stats['misses']} misses, {cache_stats['reloads']} reloads")
+pool_stats = storage.pool_stats()
+st.sidebar.caption(f"Connections: {pool_stats['created']} created, {pool_stats['reused']} reused, {pool_stats['idle']} idle, {pool_stats['discarded']} closed")
 
 if menu == "📖 View Books":
     st.markdown('<h3>📚 Library Collection</h3>', unsafe_allow_html=True)
-    search_query = st.text_input("🔍 Search by Title, Author, or Genre").lower()
-    books = get_books()
-    if search_query:
-        books = [book for book in books if search_query in book['title'].lower() or 
-                 search_query in book['author'].lower() or search_query in book['genre'].lower()]
+    search_query = st.text_input("🔍 Search by Title, Author, or Genre")
+    col_mode, col_size = st.columns([3, 1])
+    with col_mode:
+        search_mode = st.radio("Search mode", SEARCH_MODES, horizontal=True)
+    with col_size:
+        page_size = st.selectbox("Books per page", PAGE_SIZES, index=PAGE_SIZES.index(PAGE_SIZE))
+    # Each page remembers the cursor it started from, a new search starts over
+    if st.session_state.get("search_key") != (search_query, search_mode, page_size):
+        st.session_state.search_key = (search_query, search_mode, page_size)
+        st.session_state.page_cursors = [None]
+    cursors = st.session_state.page_cursors
+    books, next_cursor = get_books_page(search_query, cursors[-1], search_mode, page_size)
     if books:
-        cols = st.columns(3)
-        for index, book in enumerate(books):
-            with cols[index % 3]:
-                st.markdown(
-                    f"""
-                    <div class="book-card">
-                        <h4>{book.get('title', 'Unknown')}</h4>
-                        <p><strong>Author:</strong> {book.get('author', 'Unknown')}</p>
-                        <p><strong>Genre:</strong> {book.get('genre', 'Unknown')}</p>
-                        <p class="year"><strong>Year:</strong> {str(book.get('year', 'N/A'))}</p>
-                    </div>
-                    """,
-                    unsafe_allow_html=True
-                )
+        render_book_grid(books)
+        col_prev, col_page, col_next = st.columns(3)
+        with col_prev:
+            if st.button("⬅️ Previous", disabled=len(cursors) == 1):
+                cursors.pop()
+                st.rerun()
+        with col_page:
+            st.markdown(f"<p style='text-align: center;'>Page {len(cursors)}</p>", unsafe_allow_html=True)
+        with col_next:
+            if st.button("Next ➡️", disabled=next_cursor is None):
+                cursors.append(next_cursor)
+                st.rerun()
     else:
         st.info("No books found. Try adding some!")
 
@@ -201,12 +272,12 @@ elif menu == "➕ Add Book":
 
 elif menu == "✏️ Update Book":
     st.subheader("✏️ Update Book Details")
-    books = get_books()
+    books = get_titles()
     book_options = {book["title"]: book["id"] for book in books}
     if book_options:
         selected_title = st.selectbox("Select Book", list(book_options.keys()))
         selected_id = book_options[selected_title]
-        book = next((b for b in books if b["id"] == selected_id), None)
+        book = book_cache.book(storage, selected_id)
         if book:
             title = st.text_input("Title", book["title"])
             author = st.text_input("Author", book["author"])
@@ -219,7 +290,7 @@ elif menu == "✏️ Update Book":
 
 elif menu == "🗑️ Delete Book":
     st.subheader("🗑️ Delete Book")
-    books = get_books()
+    books = get_titles()
     book_options = {book["title"]: book["id"] for book in books}
     if book_options:
         selected_title = st.selectbox("Select Book", list(book_options.keys()))
@@ -228,4 +299,32 @@ elif menu == "🗑️ Delete Book":
         if st.button("Yes, Delete"):
             delete_book(selected_id)
     else:
-        st.warning("No books available to delete.")
\ No newline at end of file
+        st.warning("No books available to delete.")
+
+elif menu == "📦 Import / Export":
+    st.subheader("📥 Import Books")
+    uploaded_file = st.file_uploader("Upload a CSV or JSON file with title, author, genre and year", type=["csv", "json"])
+    batch_size = st.number_input("Batch size", min_value=1, max_value=5000, value=DEFAULT_BATCH_SIZE, step=100)
+    if st.button("Import Books"):
+        if uploaded_file is not None:
+            import_books(uploaded_file.getvalue(), uploaded_file.name, batch_size)
+        else:
+            st.error("Upload a file to import.")
+
+    st.subheader("📤 Export Books")
+    export_format = st.radio("Format", ["CSV", "JSON"], horizontal=True)
+    if st.button("Prepare Export"):
+        buffer = BytesIO()
+        try:
+            stats = export_books(storage.fetch_page, buffer, export_format.lower())
+        except Exception as e:
+            st.error(f"Error exporting books: {e}")
+        else:
+            buffer.seek(0)
+            st.success(f"✅ Exported {stats['rows']:,} books in {stats['seconds']:.2f}s ({stats['rows_per_second']:,.0f} books/s)")
+            st.download_button(
+                label=f"Download library.{export_format.lower()}",
+                data=buffer,
+                file_name=f"library.{export_format.lower()}",
+                mime="text/csv" if export_format == "CSV" else "application/json"
+            )
\ No newline at end of file
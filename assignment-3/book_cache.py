@@ -0,0 +1,189 @@
+import threading
+import time
+from collections import OrderedDict
+
+from queries import CARD_COLUMNS
+from search_index import SearchIndex, tokenize
+
+VERSION_POLL_SECONDS = 5
+CACHE_TTL_SECONDS = 60
+LOAD_BATCH_SIZE = 1000
+MAX_CACHED_PAGES = 256
+MAX_CACHED_RESULTS = 256
+
+
+class BookCache:
+    # One copy of the catalog per server process, shared by every session.
+    # The library version (see schema.sql and storage.py) is bumped on
+    # every write; it is polled at most every few seconds and the cache is
+    # dropped when someone else changed the table. Without a version the
+    # cache is dropped after ttl_seconds instead. Writes made through this
+    # process are applied to the cache directly, including to the search
+    # index built over the catalog. Pages and search results are kept least
+    # recently used first out.
+
+    def __init__(self, poll_seconds=VERSION_POLL_SECONDS, ttl_seconds=CACHE_TTL_SECONDS):
+        self.poll_seconds = poll_seconds
+        self.ttl_seconds = ttl_seconds
+        self.lock = threading.RLock()
+        self.books = None
+        self.index = None
+        self.titles = None
+        self.pages = OrderedDict()
+        self.results = OrderedDict()
+        self.version = None
+        self.checked_at = 0.0
+        self.cleared_at = time.monotonic()
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+    def clear(self):
+        with self.lock:
+            if self.books is not None or self.titles is not None or self.pages:
+                self.reloads += 1
+            self.books = None
+            self.index = None
+            self.titles = None
+            self.pages.clear()
+            self.results.clear()
+            self.cleared_at = time.monotonic()
+
+    def validate(self, storage):
+        now = time.monotonic()
+        if now - self.checked_at < self.poll_seconds:
+            return
+        self.checked_at = now
+        version = storage.version()
+        if version is None:
+            # No version table: writes from other processes can't be seen,
+            # so the cache only lives for ttl_seconds
+            if now - self.cleared_at >= self.ttl_seconds:
+                self.clear()
+        elif version != self.version:
+            self.clear()
+        self.version = version
+
+    @staticmethod
+    def remember(cache, key, value, max_entries):
+        cache[key] = value
+        while len(cache) > max_entries:
+            cache.popitem(last=False)
+        return value
+
+    def catalog(self, storage):
+        with self.lock:
+            self.validate(storage)
+            if self.books is not None:
+                self.hits += 1
+                return self.books
+            self.misses += 1
+            books = {}
+            after_id = None
+            while True:
+                rows, after_id = storage.fetch_page(after_id, LOAD_BATCH_SIZE)
+                books.update((book["id"], book) for book in rows)
+                if after_id is None:
+                    break
+            self.books = books
+            self.index = SearchIndex(books.values())
+            return books
+
+    def book_titles(self, storage):
+        # id and title of every book, ordered by title, for the pickers on
+        # the Update and Delete pages. Only these two columns are fetched.
+        with self.lock:
+            self.validate(storage)
+            if self.titles is not None:
+                self.hits += 1
+                return self.titles
+            self.misses += 1
+            self.titles = storage.titles()
+            return self.titles
+
+    def book(self, storage, book_id):
+        with self.lock:
+            self.validate(storage)
+            if self.books is not None:
+                return self.books.get(book_id)
+        return storage.get(book_id)
+
+    def page(self, storage, search_query, after_id, limit, full_text=False):
+        key = (search_query.strip().lower(), after_id, limit, full_text)
+        with self.lock:
+            self.validate(storage)
+            if key in self.pages:
+                self.pages.move_to_end(key)
+                self.hits += 1
+                return self.pages[key]
+            self.misses += 1
+            return self.remember(self.pages, key, storage.search(search_query, after_id, limit, full_text), MAX_CACHED_PAGES)
+
+    def search(self, storage, search_query, offset=0, limit=None):
+        # Ranked search over the in-memory index. Returns one page of books
+        # and the offset of the next page, like page() returns a cursor.
+        key = " ".join(tokenize(search_query))
+        with self.lock:
+            books = self.catalog(storage)
+            if key in self.results:
+                self.results.move_to_end(key)
+                book_ids = self.results[key]
+            else:
+                book_ids = self.remember(self.results, key, self.index.search(key), MAX_CACHED_RESULTS)
+            end = len(book_ids) if limit is None else offset + limit
+            next_offset = end if end < len(book_ids) else None
+            return [books[book_id] for book_id in book_ids[offset:end]], next_offset
+
+    def sync_version(self, storage, writes=1):
+        # Our own writes bumped the version by exactly one each. Anything
+        # more means another process wrote too and the cache must be
+        # reloaded.
+        # Without a version the write was applied and the TTL still holds.
+        version = storage.version()
+        if version is not None and (self.version is None or version != self.version + writes):
+            self.clear()
+        self.version = version
+        self.checked_at = time.monotonic()
+
+    def added(self, storage, rows, writes=1):
+        # writes is the number of write statements behind rows, e.g. one
+        # per batch of a bulk import
+        with self.lock:
+            if self.books is not None:
+                fields = CARD_COLUMNS.split(",")
+                for book in rows:
+                    book = {field: book.get(field) for field in fields}
+                    self.books[book["id"]] = book
+                    self.index.add(book)
+            self.titles = None
+            self.pages.clear()
+            self.results.clear()
+            self.sync_version(storage, writes)
+
+    def updated(self, storage, rows):
+        self.added(storage, rows)
+
+    def deleted(self, storage, book_ids):
+        with self.lock:
+            if self.books is not None:
+                for book_id in book_ids:
+                    self.books.pop(book_id, None)
+                    self.index.remove(book_id)
+            self.titles = None
+            self.pages.clear()
+            self.results.clear()
+            self.sync_version(storage)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "books": len(self.books) if self.books is not None else 0,
+                "pages": len(self.pages),
+                "terms": len(self.index.postings) if self.index is not None else 0,
+                "hits": self.hits,
+                "misses": self.misses,
+                "reloads": self.reloads,
+            }
+
+
+book_cache = BookCache()
@@ -0,0 +1,141 @@
+import csv
+import io
+import json
+import time
+from datetime import date
+
+from queries import CARD_COLUMNS
+
+REQUIRED_FIELDS = ("title", "author", "genre", "year")
+DEFAULT_BATCH_SIZE = 500
+MAX_RETRIES = 3
+RETRY_BACKOFF_SECONDS = 0.5
+EXPORT_PAGE_SIZE = 1000
+
+# The import and export functions only need a few callables, the insert,
+# retryable and fetch_page methods of either backend in storage.py:
+#   insert_batch(rows) -> inserted rows
+#   retryable(error) -> True if the failed insert certainly wrote nothing
+#   fetch_page(after_id, limit) -> (rows, next_after_id or None)
+
+
+def read_records(data, file_name):
+    # A JSON list of objects, optionally under a "books" key, or a CSV
+    # with a header row
+    text = data.decode("utf-8-sig") if isinstance(data, bytes) else data
+    if file_name.lower().endswith(".json"):
+        records = json.loads(text or "[]")
+        if isinstance(records, dict):
+            records = records.get("books", [])
+        if not isinstance(records, list) or not all(isinstance(record, dict) for record in records):
+            raise ValueError("The JSON file must hold a list of book objects")
+        return records
+    return list(csv.DictReader(io.StringIO(text)))
+
+
+def validate_book(record):
+    if not isinstance(record, dict):
+        return None, "Row is not an object"
+    book = {}
+    for field in REQUIRED_FIELDS:
+        value = record.get(field)
+        value = value.strip() if isinstance(value, str) else value
+        if value in (None, ""):
+            return None, f"Missing {field}"
+        book[field] = value
+    try:
+        book["year"] = int(float(book["year"]))
+    except (TypeError, ValueError):
+        return None, f"Year '{book['year']}' is not a number"
+    if not 1000 <= book["year"] <= date.today().year:
+        return None, f"Year {book['year']} is out of range"
+    return book, None
+
+
+def validate_records(records):
+    books = []
+    errors = []
+    for row_number, record in enumerate(records, start=1):
+        book, error = validate_book(record)
+        if error:
+            errors.append({"row": row_number, "error": error})
+        else:
+            books.append(book)
+    return books, errors
+
+
+def insert_batches(insert_batch, books, batch_size=DEFAULT_BATCH_SIZE, max_retries=MAX_RETRIES,
+                   backoff=RETRY_BACKOFF_SECONDS, on_progress=None, retryable=None):
+    # Inserts aren't idempotent, so a batch is only sent again when
+    # retryable(error) says the failed attempt wrote nothing. Any other
+    # error fails the batch, which may or may not have been stored.
+    # "writes" counts the inserts that succeeded, each one bumps the
+    # library version once.
+    stats = {"inserted": 0, "batches": 0, "writes": 0, "retries": 0, "failed": [], "rows": []}
+    started = time.perf_counter()
+    for start in range(0, len(books), batch_size):
+        batch = books[start:start + batch_size]
+        for attempt in range(max_retries + 1):
+            try:
+                inserted = insert_batch(batch)
+                stats["inserted"] += len(batch)
+                stats["writes"] += 1
+                stats["rows"].extend(inserted)
+                break
+            except Exception as e:
+                if attempt < max_retries and retryable is not None and retryable(e):
+                    stats["retries"] += 1
+                    time.sleep(backoff * 2 ** attempt)
+                else:
+                    stats["failed"].append({"rows": f"{start + 1}-{start + len(batch)}", "error": str(e)})
+                    break
+        stats["batches"] += 1
+        if on_progress:
+            on_progress(min(start + batch_size, len(books)), len(books))
+    stats["seconds"] = time.perf_counter() - started
+    stats["rows_per_second"] = stats["inserted"] / stats["seconds"] if stats["seconds"] else 0.0
+    return stats
+
+
+def export_chunks(fetch_page, file_format="csv", page_size=EXPORT_PAGE_SIZE):
+    # Yields the export one page at a time, so the whole catalog is never
+    # held as a list of rows.
+    fields = CARD_COLUMNS.split(",")
+    after_id = None
+    first = True
+    if file_format == "json":
+        yield "["
+    while True:
+        rows, after_id = fetch_page(after_id, page_size)
+        if file_format == "json":
+            for row in rows:
+                yield ("\n  " if first else ",\n  ") + json.dumps({field: row.get(field) for field in fields})
+                first = False
+        else:
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction="ignore")
+            if first:
+                writer.writeheader()
+                first = False
+            writer.writerows(rows)
+            yield buffer.getvalue()
+        if after_id is None:
+            break
+    if file_format == "json":
+        yield "\n]\n"
+
+
+def export_books(fetch_page, target, file_format="csv", page_size=EXPORT_PAGE_SIZE):
+    exported = {"rows": 0}
+
+    def counting_fetch(after_id, limit):
+        rows, next_after_id = fetch_page(after_id, limit)
+        exported["rows"] += len(rows)
+        return rows, next_after_id
+
+    started = time.perf_counter()
+    for chunk in export_chunks(counting_fetch, file_format, page_size):
+        target.write(chunk.encode())
+    seconds = time.perf_counter() - started
+    rows = exported["rows"]
+    return {"rows": rows, "seconds": seconds, "rows_per_second": rows / seconds if seconds else 0.0}
@@ -0,0 +1,131 @@
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_MAX_SIZE = 4
+DEFAULT_MAX_IDLE_SECONDS = 300
+DEFAULT_CHECK_AFTER_SECONDS = 30
+DEFAULT_ACQUIRE_TIMEOUT = 10
+
+
+class ClientPool:
+    # Clients (database connections, API clients) shared by every session
+    # in the process. Idle clients are kept alive and handed out most
+    # recently used first. A client idle longer than check_after seconds,
+    # or returned after an error, is health-checked before reuse; one idle
+    # longer than max_idle seconds is closed. At most max_size clients
+    # exist at once and callers beyond that wait for one to come back.
+
+    def __init__(self, factory, max_size=DEFAULT_MAX_SIZE, max_idle=DEFAULT_MAX_IDLE_SECONDS,
+                 check_after=DEFAULT_CHECK_AFTER_SECONDS, health_check=None, close=None):
+        self.factory = factory
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.check_after = check_after
+        self.health_check = health_check
+        self.close = close
+        self.condition = threading.Condition()
+        self.idle = []
+        self.in_use = 0
+        self.created = 0
+        self.reused = 0
+        self.discarded = 0
+        self.waits = 0
+
+    def healthy(self, client):
+        if self.health_check is None:
+            return True
+        try:
+            return bool(self.health_check(client))
+        except Exception:
+            return False
+
+    def discard(self, client):
+        with self.condition:
+            self.discarded += 1
+        if self.close is not None:
+            try:
+                self.close(client)
+            except Exception:
+                pass
+
+    def take_idle(self, deadline):
+        # Reserves a slot and returns an idle client to check, or None when
+        # a new client should be created in the slot
+        with self.condition:
+            while True:
+                if self.idle:
+                    self.in_use += 1
+                    return self.idle.pop()
+                if self.in_use < self.max_size:
+                    self.in_use += 1
+                    return None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"No client became free within the pool limit of {self.max_size}")
+                self.waits += 1
+                self.condition.wait(remaining)
+
+    def give_back_slot(self):
+        with self.condition:
+            self.in_use -= 1
+            self.condition.notify()
+
+    def acquire(self, timeout=DEFAULT_ACQUIRE_TIMEOUT):
+        deadline = time.monotonic() + timeout
+        while True:
+            entry = self.take_idle(deadline)
+            if entry is None:
+                break
+            client, returned_at = entry
+            idle_for = time.monotonic() - returned_at
+            # Checks run outside the lock so a slow one doesn't block others
+            if idle_for <= self.max_idle and (idle_for <= self.check_after or self.healthy(client)):
+                with self.condition:
+                    self.reused += 1
+                return client
+            self.discard(client)
+            self.give_back_slot()
+        try:
+            client = self.factory()
+        except Exception:
+            self.give_back_slot()
+            raise
+        with self.condition:
+            self.created += 1
+        return client
+
+    def release(self, client, suspect=False):
+        # A client returned after an error is marked as long idle, so it is
+        # health-checked before anyone gets it again
+        now = time.monotonic()
+        with self.condition:
+            self.in_use -= 1
+            self.idle.append((client, now - self.check_after - 1 if suspect else now))
+            expired = [entry for entry in self.idle if now - entry[1] > self.max_idle]
+            self.idle = [entry for entry in self.idle if now - entry[1] <= self.max_idle]
+            self.condition.notify()
+        for expired_client, _ in expired:
+            self.discard(expired_client)
+
+    @contextmanager
+    def connection(self, timeout=DEFAULT_ACQUIRE_TIMEOUT):
+        client = self.acquire(timeout)
+        try:
+            yield client
+        except BaseException:
+            self.release(client, suspect=True)
+            raise
+        else:
+            self.release(client)
+
+    def stats(self):
+        with self.condition:
+            return {
+                "created": self.created,
+                "reused": self.reused,
+                "discarded": self.discarded,
+                "waits": self.waits,
+                "idle": len(self.idle),
+                "in_use": self.in_use,
+            }
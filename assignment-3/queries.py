@@ -0,0 +1,39 @@
+PAGE_SIZE = 30
+CARD_COLUMNS = "id,title,author,genre,year"
+SEARCH_COLUMNS = ("title", "author", "genre")
+
+
+def quote_pattern(search_query):
+    # LIKE wildcards in the input are matched literally, and the pattern is
+    # quoted so commas or brackets don't break PostgREST's or=() syntax.
+    pattern = search_query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    pattern = f"%{pattern}%".replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{pattern}"'
+
+
+def search_books(client, search_query="", after_id=None, limit=PAGE_SIZE, columns=CARD_COLUMNS, full_text=False):
+    # Keyset pagination: pages are ordered by id and the next page starts
+    # after the last id seen, so the database never scans skipped rows.
+    request = client.table("books").select(columns)
+    search_query = search_query.strip()
+    if search_query and full_text:
+        request = request.text_search("fts", search_query, options={"type": "websearch", "config": "simple"})
+    elif search_query:
+        pattern = quote_pattern(search_query)
+        request = request.or_(",".join(f"{column}.ilike.{pattern}" for column in SEARCH_COLUMNS))
+    if after_id is not None:
+        request = request.gt("id", after_id)
+    rows = request.order("id").limit(limit + 1).execute().data or []
+    next_cursor = rows[limit - 1]["id"] if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def get_book_titles(client):
+    response = client.table("books").select("id,title").order("title").execute()
+    return response.data or []
+
+
+def get_book(client, book_id):
+    response = client.table("books").select(CARD_COLUMNS).eq("id", book_id).limit(1).execute()
+    return response.data[0] if response.data else None
+
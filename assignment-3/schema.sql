@@ -0,0 +1,51 @@
+-- Indexes behind the server-side search in queries.py and the version
+-- counter polled by book_cache.py.
+-- Run once in the Supabase SQL editor.
+
+-- Trigram indexes let ILIKE '%term%' on title, author and genre use an index
+create extension if not exists pg_trgm;
+
+create index if not exists books_title_trgm on books using gin (title gin_trgm_ops);
+create index if not exists books_author_trgm on books using gin (author gin_trgm_ops);
+create index if not exists books_genre_trgm on books using gin (genre gin_trgm_ops);
+
+-- Full-text search column used when "Full-text search" is enabled
+alter table books add column if not exists fts tsvector
+    generated always as (
+        to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(author, '') || ' ' || coalesce(genre, ''))
+    ) stored;
+
+create index if not exists books_fts on books using gin (fts);
+
+-- Single-row version counter, bumped once per statement that changes books,
+-- so app processes can tell cheaply whether their cached catalog is stale
+alter table books add column if not exists updated_at timestamptz not null default now();
+
+create table if not exists library_version (
+    id int primary key default 1 check (id = 1),
+    version bigint not null default 0
+);
+insert into library_version (id, version) values (1, 0) on conflict (id) do nothing;
+grant select on library_version to anon, authenticated;
+
+create or replace function bump_library_version() returns trigger language plpgsql as $$
+begin
+    update library_version set version = version + 1 where id = 1;
+    return null;
+end;
+$$;
+
+create or replace function touch_book_updated_at() returns trigger language plpgsql as $$
+begin
+    new.updated_at = now();
+    return new;
+end;
+$$;
+
+drop trigger if exists books_version on books;
+create trigger books_version after insert or update or delete on books
+    for each statement execute function bump_library_version();
+
+drop trigger if exists books_updated_at on books;
+create trigger books_updated_at before update on books
+    for each row execute function touch_book_updated_at();
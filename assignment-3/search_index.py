@@ -0,0 +1,125 @@
+import bisect
+import re
+
+FIELD_WEIGHTS = {"title": 3.0, "author": 2.0, "genre": 1.0}
+# How much a query term counts when it matches a token exactly, as the
+# start of a longer token, or with one typo
+EXACT_MATCH = 1.0
+PREFIX_MATCH = 0.6
+FUZZY_MATCH = 0.3
+MIN_FUZZY_LENGTH = 4
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(str(text or "").lower())
+
+
+def edits(term, alphabet):
+    # Every string one deletion, insertion or substitution away from term.
+    # Looking these up in the postings finds typo matches without keeping
+    # a variant map of the whole vocabulary.
+    splits = [(term[:i], term[i:]) for i in range(len(term) + 1)]
+    deleted = {left + right[1:] for left, right in splits if right}
+    inserted = {left + char + right for left, right in splits for char in alphabet}
+    replaced = {left + char + right[1:] for left, right in splits if right for char in alphabet}
+    return deleted | inserted | replaced
+
+
+class SearchIndex:
+    # Inverted index over title, author and genre tokens:
+    #   postings: token -> {book id: field weight}
+    #   vocabulary: sorted tokens, for prefix matching with bisect
+    #   alphabet: characters seen in tokens, for generating typo candidates
+
+    def __init__(self, books=()):
+        self.postings = {}
+        self.vocabulary = []
+        self.alphabet = set()
+        self.book_tokens = {}
+        self.sort_keys = {}
+        # The initial build appends new tokens and sorts the vocabulary once
+        # at the end; only later adds insert in order
+        self.building = True
+        for book in books:
+            self.add(book)
+        self.vocabulary.sort()
+        self.building = False
+
+    def __len__(self):
+        return len(self.book_tokens)
+
+    def add_token(self, token):
+        self.postings[token] = {}
+        self.alphabet.update(token)
+        if self.building:
+            self.vocabulary.append(token)
+        else:
+            bisect.insort(self.vocabulary, token)
+
+    def remove_token(self, token):
+        del self.postings[token]
+        if self.building:
+            self.vocabulary.remove(token)
+        else:
+            del self.vocabulary[bisect.bisect_left(self.vocabulary, token)]
+
+    def add(self, book):
+        book_id = book["id"]
+        self.remove(book_id)
+        weights = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in set(tokenize(book.get(field))):
+                weights[token] = weights.get(token, 0.0) + weight
+        for token, weight in weights.items():
+            if token not in self.postings:
+                self.add_token(token)
+            self.postings[token][book_id] = weight
+        self.book_tokens[book_id] = list(weights)
+        self.sort_keys[book_id] = (str(book.get("title") or "").lower(), book_id)
+
+    def remove(self, book_id):
+        for token in self.book_tokens.pop(book_id, ()):
+            books = self.postings[token]
+            books.pop(book_id, None)
+            if not books:
+                self.remove_token(token)
+        self.sort_keys.pop(book_id, None)
+
+    def expand(self, term):
+        # Index tokens the query term can stand for, with the best match
+        # quality for each
+        matches = {}
+        if len(term) >= MIN_FUZZY_LENGTH:
+            for candidate in edits(term, self.alphabet):
+                if candidate in self.postings:
+                    matches[candidate] = FUZZY_MATCH
+        position = bisect.bisect_left(self.vocabulary, term)
+        while position < len(self.vocabulary) and self.vocabulary[position].startswith(term):
+            matches[self.vocabulary[position]] = PREFIX_MATCH
+            position += 1
+        if term in self.postings:
+            matches[term] = EXACT_MATCH
+        return matches
+
+    def search(self, query):
+        # Book ids matching every query term, best first. Ties are broken by
+        # title so the order is stable between pages.
+        terms = tokenize(query)
+        if not terms:
+            return []
+        scores = None
+        for term in dict.fromkeys(terms):
+            term_scores = {}
+            for token, quality in self.expand(term).items():
+                for book_id, weight in self.postings[token].items():
+                    score = quality * weight
+                    if score > term_scores.get(book_id, 0.0):
+                        term_scores[book_id] = score
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {book_id: scores[book_id] + score for book_id, score in term_scores.items() if book_id in scores}
+            if not scores:
+                return []
+        return sorted(scores, key=lambda book_id: (-scores[book_id], self.sort_keys[book_id]))
@@ -0,0 +1,222 @@
+import json
+import os
+import sqlite3
+import threading
+
+from client_pool import ClientPool
+from queries import CARD_COLUMNS, PAGE_SIZE, get_book, get_book_titles, search_books
+
+BOOK_FIELDS = ("title", "author", "genre", "year")
+DEFAULT_SQLITE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "library.sqlite3")
+SEED_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "library.json")
+POOL_SIZE = int(os.getenv("STORAGE_POOL_SIZE", 4))
+
+# Both backends offer the same methods, so the app, the book cache and bulk
+# import/export never talk to a database directly:
+#   search(search_query, after_id, limit, full_text) -> (rows, next_cursor)
+#   fetch_page(after_id, limit) -> (rows, next_cursor)
+#   titles() -> id and title of every book, ordered by title
+#   get(book_id) -> one book, or None
+#   insert(rows) / update(book_id, values) / delete(book_id) -> affected rows
+#   retryable(error) -> True if a failed write certainly changed nothing
+#   version() -> library version counter, or None if unavailable
+#   pool_stats() -> connection pool metrics
+
+
+class SupabaseStorage:
+    def __init__(self, url, key, pool_size=POOL_SIZE):
+        from supabase import create_client
+
+        self.pool = ClientPool(
+            lambda: create_client(url, key), max_size=pool_size,
+            health_check=lambda client: client.table("books").select("id").limit(1).execute() is not None
+        )
+
+    def search(self, search_query="", after_id=None, limit=PAGE_SIZE, full_text=False):
+        with self.pool.connection() as client:
+            return search_books(client, search_query, after_id, limit, full_text=full_text)
+
+    def fetch_page(self, after_id, limit):
+        return self.search(after_id=after_id, limit=limit)
+
+    def titles(self):
+        with self.pool.connection() as client:
+            return get_book_titles(client)
+
+    def get(self, book_id):
+        with self.pool.connection() as client:
+            return get_book(client, book_id)
+
+    def insert(self, rows):
+        with self.pool.connection() as client:
+            return client.table("books").insert(rows).execute().data or []
+
+    def retryable(self, error):
+        # Only failures before the request went out: no free pooled client,
+        # or no connection to the server. A timeout or error after sending
+        # may still have written the rows.
+        import httpx
+
+        return isinstance(error, (TimeoutError, httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout))
+
+    def update(self, book_id, values):
+        with self.pool.connection() as client:
+            return client.table("books").update(values).eq("id", book_id).execute().data or []
+
+    def delete(self, book_id):
+        with self.pool.connection() as client:
+            return client.table("books").delete().eq("id", book_id).execute().data or []
+
+    def version(self):
+        try:
+            with self.pool.connection() as client:
+                data = client.table("library_version").select("version").eq("id", 1).execute().data
+            return data[0]["version"] if data else None
+        except Exception:
+            return None
+
+    def pool_stats(self):
+        return self.pool.stats()
+
+
+SQLITE_SCHEMA = """
+create table if not exists books (
+    id integer primary key autoincrement,
+    title text not null,
+    author text not null,
+    genre text not null,
+    year integer not null,
+    updated_at text not null default current_timestamp
+);
+create index if not exists books_title on books (title collate nocase);
+create index if not exists books_author on books (author collate nocase);
+create index if not exists books_genre on books (genre collate nocase);
+create table if not exists library_version (
+    id integer primary key check (id = 1),
+    version integer not null default 0
+);
+insert or ignore into library_version (id, version) values (1, 0);
+"""
+
+
+class SQLiteStorage:
+    # Local single-file backend. WAL lets pooled connections read alongside
+    # a writer; writes are serialized by a lock. Every write statement bumps
+    # library_version in the same transaction, matching the statement-level
+    # trigger in schema.sql.
+
+    def __init__(self, path=DEFAULT_SQLITE_PATH, seed_path=SEED_PATH, pool_size=POOL_SIZE):
+        self.path = path
+        self.write_lock = threading.Lock()
+        self.pool = ClientPool(
+            self.connect, max_size=pool_size,
+            health_check=lambda connection: connection.execute("select 1").fetchone(),
+            close=lambda connection: connection.close()
+        )
+        with self.pool.connection() as connection:
+            connection.execute("pragma journal_mode = wal")
+            connection.executescript(SQLITE_SCHEMA)
+            empty = not connection.execute("select 1 from books limit 1").fetchone()
+        if empty and seed_path and os.path.exists(seed_path):
+            with open(seed_path, encoding="utf-8") as f:
+                seed = json.load(f)
+            if seed:
+                self.insert([{field: book[field] for field in BOOK_FIELDS} for book in seed])
+
+    def connect(self):
+        connection = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+        connection.row_factory = sqlite3.Row
+        connection.execute("pragma synchronous = normal")
+        return connection
+
+    def query(self, sql, params=()):
+        with self.pool.connection() as connection:
+            return [dict(row) for row in connection.execute(sql, params)]
+
+    def write(self, sql, rows_params):
+        # Runs one statement per parameter set in a single transaction and
+        # returns the affected rows
+        with self.write_lock, self.pool.connection() as connection, connection:
+            rows = []
+            for params in rows_params:
+                rows.extend(dict(row) for row in connection.execute(sql, params))
+            connection.execute("update library_version set version = version + 1 where id = 1")
+            return rows
+
+    def search(self, search_query="", after_id=None, limit=PAGE_SIZE, full_text=False):
+        # Case-insensitive substring search like the ILIKE query in
+        # queries.py. Full-text mode matches every word instead of the
+        # whole phrase.
+        conditions, params = [], []
+        search_query = search_query.strip()
+        terms = search_query.split() if full_text else [search_query] if search_query else []
+        for term in terms:
+            pattern = "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            conditions.append("(title like ? escape '\\' or author like ? escape '\\' or genre like ? escape '\\')")
+            params += [pattern] * 3
+        if after_id is not None:
+            conditions.append("id > ?")
+            params.append(after_id)
+        where = f"where {' and '.join(conditions)}" if conditions else ""
+        rows = self.query(f"select {CARD_COLUMNS} from books {where} order by id limit ?", params + [limit + 1])
+        next_cursor = rows[limit - 1]["id"] if len(rows) > limit else None
+        return rows[:limit], next_cursor
+
+    def fetch_page(self, after_id, limit):
+        return self.search(after_id=after_id, limit=limit)
+
+    def titles(self):
+        return self.query("select id, title from books order by title")
+
+    def get(self, book_id):
+        rows = self.query(f"select {CARD_COLUMNS} from books where id = ?", (book_id,))
+        return rows[0] if rows else None
+
+    def insert(self, rows):
+        return self.write(
+            f"insert into books (title, author, genre, year) values (?, ?, ?, ?) returning {CARD_COLUMNS}",
+            [[row[field] for field in BOOK_FIELDS] for row in rows]
+        )
+
+    def retryable(self, error):
+        # write() runs in one transaction that is rolled back on any error,
+        # so a busy or locked database, or no free pooled connection,
+        # leaves nothing behind
+        return isinstance(error, (TimeoutError, sqlite3.OperationalError))
+
+    def update(self, book_id, values):
+        fields = [field for field in BOOK_FIELDS if field in values]
+        assignments = ", ".join(f"{field} = ?" for field in fields)
+        return self.write(
+            f"update books set {assignments}, updated_at = current_timestamp where id = ? returning {CARD_COLUMNS}",
+            [[values[field] for field in fields] + [book_id]]
+        )
+
+    def delete(self, book_id):
+        return self.write(f"delete from books where id = ? returning {CARD_COLUMNS}", [[book_id]])
+
+    def version(self):
+        rows = self.query("select version from library_version where id = 1")
+        return rows[0]["version"] if rows else None
+
+    def pool_stats(self):
+        return self.pool.stats()
+
+
+storages = {}
+storages_lock = threading.Lock()
+
+
+def open_storage():
+    # STORAGE_BACKEND=sqlite keeps the library in a local file
+    # (LIBRARY_DB_PATH), anything else uses Supabase. The app script runs
+    # again on every rerun, so one storage (and its pool) is kept per
+    # configuration for the whole process.
+    if os.getenv("STORAGE_BACKEND", "supabase").lower() == "sqlite":
+        config = ("sqlite", os.getenv("LIBRARY_DB_PATH", DEFAULT_SQLITE_PATH))
+    else:
+        config = ("supabase", os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
+    with storages_lock:
+        if config not in storages:
+            storages[config] = SQLiteStorage(config[1]) if config[0] == "sqlite" else SupabaseStorage(*config[1:])
+        return storages[config]
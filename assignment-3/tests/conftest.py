@@ -0,0 +1,14 @@
+import os
+import sys
+
+import pytest
+
+# The app imports its modules by bare name
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def storage(tmp_path):
+    from storage import SQLiteStorage
+
+    return SQLiteStorage(str(tmp_path / "library.sqlite3"), seed_path=None)
@@ -0,0 +1,48 @@
+from book_cache import BookCache
+
+
+def book(title, author="Author", genre="Fiction", year=2000):
+    return {"title": title, "author": author, "genre": genre, "year": year}
+
+
+def test_own_writes_keep_the_cache(storage):
+    cache = BookCache(poll_seconds=3600)
+    storage.insert([book("Dune")])
+    cache.catalog(storage)
+    rows = storage.insert([book("Emma")])
+    cache.added(storage, rows)
+    assert cache.reloads == 0
+    assert sorted(row["title"] for row in cache.books.values()) == ["Dune", "Emma"]
+    assert cache.version == storage.version()
+
+
+def test_external_write_clears_the_cache(storage):
+    cache = BookCache(poll_seconds=3600)
+    storage.insert([book("Dune")])
+    cache.catalog(storage)
+    # Another process writes, then this one does
+    storage.insert([book("Emma")])
+    rows = storage.insert([book("Persuasion")])
+    cache.added(storage, rows)
+    assert cache.books is None
+    assert cache.reloads == 1
+    assert sorted(row["title"] for row in cache.catalog(storage).values()) == ["Dune", "Emma", "Persuasion"]
+
+
+def test_bulk_writes_count_once_per_batch(storage):
+    cache = BookCache(poll_seconds=3600)
+    cache.catalog(storage)
+    rows = storage.insert([book("A")]) + storage.insert([book("B")])
+    cache.added(storage, rows, writes=2)
+    assert cache.reloads == 0
+    assert len(cache.books) == 2
+
+
+def test_search_uses_the_updated_index(storage):
+    cache = BookCache(poll_seconds=3600)
+    rows = storage.insert([book("Dune"), book("Emma")])
+    cache.catalog(storage)
+    cache.updated(storage, storage.update(rows[1]["id"], {"title": "Dune Messiah"}))
+    cache.deleted(storage, [row["id"] for row in storage.delete(rows[0]["id"])])
+    assert [row["title"] for row in cache.search(storage, "dune")[0]] == ["Dune Messiah"]
+    assert cache.reloads == 0
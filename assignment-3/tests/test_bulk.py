@@ -0,0 +1,72 @@
+import sqlite3
+
+import pytest
+
+from bulk import insert_batches, read_records, validate_records
+
+
+def book(title, author="Author", genre="Fiction", year=2000):
+    return {"title": title, "author": author, "genre": genre, "year": year}
+
+
+def test_read_records_accepts_a_list_or_books_key():
+    assert read_records(b'[{"title": "A"}]', "books.json") == [{"title": "A"}]
+    assert read_records(b'{"books": [{"title": "A"}]}', "books.json") == [{"title": "A"}]
+    assert read_records(b"", "books.json") == []
+
+
+@pytest.mark.parametrize("data", [b"5", b'"abc"', b'{"books": 3}', b'{"books": "abc"}', b"[1, 2]", b'["abc"]'])
+def test_read_records_rejects_anything_but_a_list_of_objects(data):
+    with pytest.raises(ValueError):
+        read_records(data, "books.json")
+
+
+def test_read_records_csv():
+    records = read_records(b"title,author,genre,year\nA,B,C,2001\n", "books.csv")
+    books, errors = validate_records(records)
+    assert books == [{"title": "A", "author": "B", "genre": "C", "year": 2001}]
+    assert errors == []
+
+
+def flaky(storage, errors):
+    # insert_batch that raises the given errors, one per call, before
+    # writing
+    def insert_batch(rows):
+        if errors:
+            raise errors.pop(0)
+        return storage.insert(rows)
+    return insert_batch
+
+
+def test_insert_batches_retries_retryable_errors(storage):
+    books = [book(f"Book {n}") for n in range(5)]
+    stats = insert_batches(
+        flaky(storage, [sqlite3.OperationalError("database is locked")]), books,
+        batch_size=2, backoff=0, retryable=storage.retryable
+    )
+    assert stats["inserted"] == 5
+    assert stats["batches"] == 3
+    assert stats["retries"] == 1
+    assert stats["writes"] == 3
+    assert stats["failed"] == []
+    assert storage.version() == stats["writes"]
+    assert len(storage.fetch_page(None, 10)[0]) == 5
+
+
+def test_insert_batches_does_not_retry_other_errors(storage):
+    books = [book(f"Book {n}") for n in range(4)]
+    stats = insert_batches(
+        flaky(storage, [ValueError("bad row")]), books, batch_size=2, backoff=0, retryable=storage.retryable
+    )
+    assert stats["retries"] == 0
+    assert stats["failed"] == [{"rows": "1-2", "error": "bad row"}]
+    assert stats["inserted"] == 2
+    assert stats["writes"] == 1
+    assert storage.version() == 1
+
+
+def test_insert_batches_without_retryable_never_retries(storage):
+    stats = insert_batches(flaky(storage, [TimeoutError("no free client")]), [book("A")], backoff=0)
+    assert stats["retries"] == 0
+    assert stats["writes"] == 0
+    assert len(stats["failed"]) == 1
@@ -0,0 +1,44 @@
+from search_index import SearchIndex
+
+
+def book(book_id, title, author="Author", genre="Fiction"):
+    return {"id": book_id, "title": title, "author": author, "genre": genre}
+
+
+def assert_consistent(index):
+    assert index.vocabulary == sorted(index.postings)
+
+
+def test_vocabulary_stays_sorted():
+    index = SearchIndex([book(1, "Zebra Crossing"), book(2, "Apple Pie", "Mary Berry", "Cooking")])
+    assert_consistent(index)
+    index.add(book(3, "Middlemarch", "George Eliot", "Classic"))
+    index.add(book(4, "Banana Bread", "Aaron Zed"))
+    assert_consistent(index)
+    index.remove(1)
+    assert "zebra" not in index.vocabulary
+    assert_consistent(index)
+    # Updating a book drops the tokens only it used
+    index.add(book(2, "Apple Tart", "Mary Berry", "Cooking"))
+    assert "pie" not in index.vocabulary
+    assert "tart" in index.vocabulary
+    assert_consistent(index)
+    index.remove(99)
+    assert_consistent(index)
+
+
+def test_shared_tokens_survive_a_removal():
+    index = SearchIndex([book(1, "Dune"), book(2, "Dune Messiah")])
+    index.remove(1)
+    assert index.search("dune") == [2]
+    index.remove(2)
+    assert index.vocabulary == []
+    assert index.search("dune") == []
+
+
+def test_prefix_and_typo_matches_after_adds():
+    index = SearchIndex([book(1, "Persuasion")])
+    index.add(book(2, "Pride and Prejudice"))
+    assert index.search("pre") == [2]
+    assert index.search("prejudise") == [2]
+    assert index.search("persuasion") == [1]
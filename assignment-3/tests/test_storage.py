@@ -0,0 +1,48 @@
+def book(title, author="Author", genre="Fiction", year=2000):
+    return {"title": title, "author": author, "genre": genre, "year": year}
+
+
+def test_keyset_pagination(storage):
+    ids = [row["id"] for row in storage.insert([book(f"Book {n}") for n in range(5)])]
+    pages = []
+    after_id = None
+    while True:
+        rows, after_id = storage.fetch_page(after_id, 2)
+        pages.append([row["id"] for row in rows])
+        if after_id is None:
+            break
+    assert pages == [ids[0:2], ids[2:4], ids[4:]]
+
+
+def test_next_cursor_is_none_on_an_exactly_full_last_page(storage):
+    ids = [row["id"] for row in storage.insert([book(f"Book {n}") for n in range(4)])]
+    rows, next_cursor = storage.search(limit=2)
+    assert next_cursor == ids[1]
+    rows, next_cursor = storage.search(after_id=next_cursor, limit=2)
+    assert [row["id"] for row in rows] == ids[2:]
+    assert next_cursor is None
+
+
+def test_search_pages_by_cursor(storage):
+    storage.insert([book("Dune"), book("Emma"), book("Dune Messiah"), book("Children of Dune")])
+    rows, next_cursor = storage.search("dune", limit=2)
+    assert [row["title"] for row in rows] == ["Dune", "Dune Messiah"]
+    rows, next_cursor = storage.search("dune", after_id=next_cursor, limit=2)
+    assert [row["title"] for row in rows] == ["Children of Dune"]
+    assert next_cursor is None
+
+
+def test_like_wildcards_match_literally(storage):
+    storage.insert([book("50% off"), book("500 days"), book("a_b"), book("axb"), book("back\\slash")])
+    assert [row["title"] for row in storage.search("50%")[0]] == ["50% off"]
+    assert [row["title"] for row in storage.search("a_b")[0]] == ["a_b"]
+    assert [row["title"] for row in storage.search("k\\s")[0]] == ["back\\slash"]
+    assert [row["title"] for row in storage.search("off 50%", full_text=True)[0]] == ["50% off"]
+
+
+def test_every_write_bumps_the_version(storage):
+    assert storage.version() == 0
+    rows = storage.insert([book("A"), book("B")])
+    storage.update(rows[0]["id"], {"title": "C"})
+    storage.delete(rows[1]["id"])
+    assert storage.version() == 3
@@ -1,68 +1,52 @@
 import streamlit as st
-import hashlib
 import json
-import time
-from cryptography.fernet import Fernet
-import base64
+import io
+from cryptography.exceptions import InvalidTag
+from keys import key_cache
+from secure_store import secure_store
+from lockout import lockout, MAX_ATTEMPTS
+from batch import DEFAULT_WORKERS, read_records, encrypt_records, decrypt_records, results_csv
 
 
-if 'failed_attempts' not in st.session_state:
-    st.session_state.failed_attempts = 0
-if 'stored_data' not in st.session_state:
-    st.session_state.stored_data = {}
 if 'current_page' not in st.session_state:
     st.session_state.current_page = "Home"
-if 'last_attempt_time' not in st.session_state:
-    st.session_state.last_attempt_time = 0
+if 'locked_data_id' not in st.session_state:
+    st.session_state.locked_data_id = None
 
 
-def hash_passkey(passkey):
-    return hashlib.sha256(passkey.encode()).hexdigest()
+def encrypt_data(data, passkey):
+    # Returns the new entry's data ID. Uploaded files are encrypted chunk
+    # by chunk instead of as one token.
+    if isinstance(data, str):
+        return secure_store.put(data, passkey)
+    return secure_store.put_file(data, data.name, passkey)
 
 
-def generate_key_from_passkey(passkey):
-    
-    hashed = hashlib.sha256(passkey.encode()).digest()
-    
-    return base64.urlsafe_b64encode(hashed[:32])
-
-
-def encrypt_data(text, passkey):
-    key = generate_key_from_passkey(passkey)
-    cipher = Fernet(key)
-    return cipher.encrypt(text.encode()).decode()
-
-
-def decrypt_data(encrypted_text, passkey, data_id):
+def decrypt_data(data_id, passkey):
+    # Attempts are counted per data ID in the shared lockout store, so a
+    # new tab or another server process sees the same count. Returns the
+    # text and whether the attempt was allowed at all.
+    allowed, _ = lockout.take(data_id)
+    if not allowed:
+        return None, False
     try:
         
-        hashed_passkey = hash_passkey(passkey)
-        if data_id in st.session_state.stored_data and st.session_state.stored_data[data_id]["passkey"] == hashed_passkey:
-            
-            key = generate_key_from_passkey(passkey)
-            cipher = Fernet(key)
-            decrypted = cipher.decrypt(encrypted_text.encode()).decode()
-            st.session_state.failed_attempts = 0
-            return decrypted
+        decrypted = secure_store.get(data_id, passkey)
+        if decrypted is not None:
+            lockout.reset(data_id)
+            return decrypted, True
         else:
             
-            st.session_state.failed_attempts += 1
-            st.session_state.last_attempt_time = time.time()
-            return None
+            return None, True
     except Exception as e:
         
-        st.session_state.failed_attempts += 1
-        st.session_state.last_attempt_time = time.time()
-        return None
-
-
-def generate_data_id():
-    import uuid
-    return str(uuid.uuid4())
+        return None, True
 
 
 def reset_failed_attempts():
-    st.session_state.failed_attempts = 0
+    if st.session_state.locked_data_id:
+        lockout.reset(st.session_state.locked_data_id)
+    st.session_state.locked_data_id = None
 
 
 def change_page(page):
@@ -72,14 +56,17 @@ def change_page(page):
 st.title("🔒 Secure Data Encryption System")
 
 
-menu = ["Home", "Store Data", "Retrieve Data", "Login"]
+menu = ["Home", "Store Data", "Retrieve Data", "Batch", "Login"]
 choice = st.sidebar.selectbox("Navigation", menu, index=menu.index(st.session_state.current_page))
 
 
 st.session_state.current_page = choice
 
+key_stats = key_cache.stats()
+st.sidebar.caption(f"Derived keys cached: {key_stats['keys']} ({key_stats['hits']} hits, {key_stats['misses']} derivations)")
+
 
-if st.session_state.failed_attempts >= 3:
+if st.session_state.locked_data_id and lockout.locked(st.session_state.locked_data_id):
     
     st.session_state.current_page = "Login"
     st.warning("🔒 Too many failed attempts! Reauthorization required.")
@@ -98,11 +85,15 @@ if st.session_state.current_page == "Home":
             change_page("Retrieve Data")
     
     
-    st.info(f"Currently storing {len(st.session_state.stored_data)} encrypted data entries.")
+    st.info(f"Currently storing {secure_store.count()} encrypted data entries.")
 
 elif st.session_state.current_page == "Store Data":
     st.subheader("📂 Store Data Securely")
-    user_data = st.text_area("Enter Data:")
+    data_kind = st.radio("Store:", ["Text", "File"], horizontal=True)
+    if data_kind == "Text":
+        user_data = st.text_area("Enter Data:")
+    else:
+        user_data = st.file_uploader("Choose a file:")
     passkey = st.text_input("Enter Passkey:", type="password")
     confirm_passkey = st.text_input("Confirm Passkey:", type="password")
 
@@ -112,19 +103,7 @@ elif st.session_state.current_page == "Store Data":
                 st.error("⚠️ Passkeys do not match!")
             else:
                 
-                data_id = generate_data_id()
-                
-                
-                hashed_passkey = hash_passkey(passkey)
-                
-                
-                encrypted_text = encrypt_data(user_data, passkey)
-                
-                
-                st.session_state.stored_data[data_id] = {
-                    "encrypted_text": encrypted_text,
-                    "passkey": hashed_passkey
-                }
+                data_id = encrypt_data(user_data, passkey)
                 
                 st.success("✅ Data stored securely!")
                 
@@ -138,50 +117,110 @@ elif st.session_state.current_page == "Retrieve Data":
     st.subheader("🔍 Retrieve Your Data")
     
     
-    attempts_remaining = 3 - st.session_state.failed_attempts
-    st.info(f"Attempts remaining: {attempts_remaining}")
-    
     data_id = st.text_input("Enter Data ID:")
     passkey = st.text_input("Enter Passkey:", type="password")
+    
+    
+    attempts_remaining = lockout.remaining(data_id) if data_id else MAX_ATTEMPTS
+    st.info(f"Attempts remaining: {attempts_remaining}")
 
     if st.button("Decrypt"):
         if data_id and passkey:
-            if data_id in st.session_state.stored_data:
-                encrypted_text = st.session_state.stored_data[data_id]["encrypted_text"]
-                decrypted_text = decrypt_data(encrypted_text, passkey, data_id)
-
-                if decrypted_text:
+            if data_id in secure_store:
+                decrypted_text, allowed = decrypt_data(data_id, passkey)
+
+                if decrypted_text and secure_store.kind(data_id) == "file":
+                    # For a file entry decrypted_text is the file name. The
+                    # preview decrypts only the first chunk. The download
+                    # button sends its data from memory, so this is the one
+                    # place the whole file is held.
+                    decrypted_file = io.BytesIO()
+                    try:
+                        preview = secure_store.get_file_chunk(data_id, passkey, 0) or b""
+                        secure_store.get_file(data_id, passkey, decrypted_file)
+                    except (InvalidTag, ValueError, IndexError, OSError):
+                        st.error("❌ The stored file is damaged or incomplete and failed its integrity check!")
+                    else:
+                        st.success("✅ Decryption successful!")
+                        st.markdown(f"### Your Decrypted File: {decrypted_text}")
+                        st.code(preview[:2000].decode(errors="replace"), language="text")
+                        st.download_button("Download File", decrypted_file.getvalue(), file_name=decrypted_text, on_click="ignore")
+                elif decrypted_text:
                     st.success("✅ Decryption successful!")
                     st.markdown("### Your Decrypted Data:")
                     st.code(decrypted_text, language="text")
+                elif not allowed:
+                    # The attempt was refused before the passkey was tried
+                    st.error("🔒 This Data ID is locked after too many failed attempts. Reauthorize to unlock it.")
                 else:
-                    st.error(f"❌ Incorrect passkey! Attempts remaining: {3 - st.session_state.failed_attempts}")
+                    st.error(f"❌ Incorrect passkey! Attempts remaining: {lockout.remaining(data_id)}")
             else:
                 st.error("❌ Data ID not found!")
                 
             
-            if st.session_state.failed_attempts >= 3:
+            if data_id in secure_store and lockout.locked(data_id):
+                st.session_state.locked_data_id = data_id
                 st.warning("🔒 Too many failed attempts! Redirecting to Login Page.")
                 st.session_state.current_page = "Login"
                 st.rerun()  
         else:
             st.error("⚠️ Both fields are required!")
 
+elif st.session_state.current_page == "Batch":
+    st.subheader("📦 Batch Encrypt / Decrypt")
+    mode = st.radio("Mode:", ["Encrypt", "Decrypt"], horizontal=True)
+    if mode == "Encrypt":
+        st.write("Upload a JSON list or CSV of records with **data** and **passkey** fields.")
+    else:
+        st.write("Upload a JSON list or CSV of records with **data_id** and **passkey** fields.")
+        st.info(f"Each Data ID allows {MAX_ATTEMPTS} attempts before it is locked, shared with single retrievals.")
+    records_file = st.file_uploader("Records file:", type=["json", "csv"])
+    workers = st.number_input("Worker threads:", min_value=1, max_value=32, value=DEFAULT_WORKERS)
+
+    if st.button("Run Batch"):
+        if records_file is None:
+            st.error("⚠️ Upload a records file first!")
+        else:
+            try:
+                records = read_records(records_file.getvalue(), records_file.name)
+            except Exception as e:
+                records = None
+                st.error(f"⚠️ Could not read {records_file.name}: {e}")
+            if records is not None:
+                progress = st.progress(0.0, text="Processing records...")
+                on_progress = lambda done, total: progress.progress(done / total, text=f"Processed {done:,} of {total:,} records")
+                if mode == "Encrypt":
+                    results, stats = encrypt_records(secure_store, records, workers, on_progress=on_progress)
+                else:
+                    # Every record takes an attempt from its data ID's lockout bucket
+                    results, stats = decrypt_records(secure_store, records, workers, lockout=lockout, on_progress=on_progress)
+                st.success(
+                    f"✅ {stats['succeeded']:,} of {stats['records']:,} records in {stats['seconds']:.2f}s "
+                    f"({stats['records_per_second']:,.0f} records/s, {stats['passkeys']} distinct passkeys)"
+                )
+                failures = [result for result in results if "error" in result]
+                if failures:
+                    st.error(f"❌ {len(failures):,} records failed:")
+                    st.dataframe([{"row": f["row"], "error": f["error"]} for f in failures[:100]])
+                st.download_button(
+                    "Download Results", results_csv(results), file_name=f"batch_{mode.lower()}_results.csv", mime="text/csv", on_click="ignore"
+                )
+                if mode == "Encrypt":
+                    st.info("⚠️ Save the results file! It holds the Data IDs you'll need to retrieve your data.")
+
 elif st.session_state.current_page == "Login":
     st.subheader("🔑 Reauthorization Required")
     
     
-    if time.time() - st.session_state.last_attempt_time < 10 and st.session_state.failed_attempts >= 3:
-        remaining_time = int(10 - (time.time() - st.session_state.last_attempt_time))
-        st.warning(f"🕒 Please wait {remaining_time} seconds before trying again.")
-    else:
-        login_pass = st.text_input("Enter Master Password:", type="password")
-
-        if st.button("Login"):
-            if login_pass == "87626":   
-                reset_failed_attempts()
-                st.success("✅ Reauthorized successfully!")
-                st.session_state.current_page = "Home"
-                st.rerun()  
-            else:
-                st.error("❌ Incorrect password!")
+    if st.session_state.locked_data_id:
+        st.warning("🕒 This Data ID stays locked until you reauthorize with the master password.")
+    login_pass = st.text_input("Enter Master Password:", type="password")
+
+    if st.button("Login"):
+        if login_pass == "87626":   
+            reset_failed_attempts()
+            st.success("✅ Reauthorized successfully!")
+            st.session_state.current_page = "Home"
+            st.rerun()  
+        else:
+            st.error("❌ Incorrect password!")
@@ -0,0 +1,138 @@
+import csv
+import io
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+DEFAULT_WORKERS = min(8, os.cpu_count() or 1)
+
+
+def read_records(data, file_name):
+    # A JSON list of objects or a CSV with a header row
+    text = data.decode("utf-8-sig") if isinstance(data, bytes) else data
+    if file_name.lower().endswith(".json"):
+        records = json.loads(text or "[]")
+        if not isinstance(records, list):
+            raise ValueError("The JSON file must hold a list of records")
+        return records
+    return list(csv.DictReader(io.StringIO(text)))
+
+
+def field(record, name):
+    value = record.get(name) if isinstance(record, dict) else None
+    return "" if value is None else str(value)
+
+
+def run_pool(func, items, max_workers, on_progress, on_error):
+    # Runs func over items on a thread pool and returns results in item
+    # order. An item that raises gets on_error(item, error) as its result,
+    # so one bad record doesn't abort the batch. Progress is reported from
+    # the calling thread.
+    results = [None] * len(items)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items) or 1))) as pool:
+        futures = {pool.submit(func, item): index for index, item in enumerate(items)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            index = futures[future]
+            try:
+                results[index] = future.result()
+            except Exception as e:
+                results[index] = on_error(items[index], e)
+            if on_progress:
+                on_progress(done, len(items))
+    return results
+
+
+def summarize(results, started, passkeys):
+    # passkeys is the number of distinct passkeys, each derived at most once
+    # (see KeyCache)
+    seconds = time.perf_counter() - started
+    succeeded = sum(1 for result in results if "error" not in result)
+    return {
+        "records": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "passkeys": passkeys,
+        "seconds": seconds,
+        "records_per_second": len(results) / seconds if seconds else 0.0,
+    }
+
+
+def encrypt_records(store, records, max_workers=DEFAULT_WORKERS, on_progress=None):
+    # Records need "data" and "passkey". Returns one result per record,
+    # {"row", "data_id"} or {"row", "error"}, and the batch stats.
+    started = time.perf_counter()
+    results = []
+    valid = []
+    for row, record in enumerate(records, start=1):
+        text, passkey = field(record, "data"), field(record, "passkey")
+        if text and passkey:
+            valid.append((row, text, passkey))
+        else:
+            results.append({"row": row, "error": "Missing data or passkey"})
+    passkeys = len({passkey for _, _, passkey in valid})
+    sealed = run_pool(
+        lambda item: store.seal(item[1], item[2]), valid, max_workers, on_progress,
+        lambda item, error: {"row": item[0], "error": f"Could not encrypt: {error}"}
+    )
+    results.extend(entry for entry in sealed if isinstance(entry, dict))
+    valid = [(item, entry) for item, entry in zip(valid, sealed) if not isinstance(entry, dict)]
+    data_ids = store.insert_many([entry for _, entry in valid])
+    results.extend({"row": row, "data_id": data_id} for ((row, _, _), _), data_id in zip(valid, data_ids))
+    results.sort(key=lambda result: result["row"])
+    return results, summarize(results, started, passkeys)
+
+
+def decrypt_records(store, records, max_workers=DEFAULT_WORKERS, lockout=None, on_progress=None):
+    # Records need "data_id" and "passkey". Returns one result per record,
+    # {"row", "data_id", "data"} or {"row", "data_id", "error"}, and the
+    # batch stats. With a lockout every distinct passkey tried on a data ID
+    # takes an attempt from its bucket, so a batch can't be used to guess
+    # passkeys. Attempts are taken up front and correct passkeys reset
+    # their buckets afterwards, one lockout transaction each.
+    started = time.perf_counter()
+    rows = store.rows(field(record, "data_id") for record in records)
+    attempts = list(dict.fromkeys(
+        (field(record, "data_id"), field(record, "passkey")) for record in records
+        if field(record, "data_id") in rows and field(record, "passkey")
+    ))
+    allowed = {}
+    if lockout is not None:
+        taken = lockout.take_many([data_id for data_id, _ in attempts])
+        allowed = {attempt: result[0] for attempt, result in zip(attempts, taken)}
+    opened = set()
+
+    def decrypt(item):
+        row, record = item
+        data_id, passkey = field(record, "data_id"), field(record, "passkey")
+        if not data_id or not passkey:
+            return {"row": row, "data_id": data_id, "error": "Missing data_id or passkey"}
+        if data_id not in rows:
+            return {"row": row, "data_id": data_id, "error": "Data ID not found"}
+        salt, token, kind = rows[data_id]
+        if lockout is not None and not allowed[data_id, passkey]:
+            return {"row": row, "data_id": data_id, "error": "Locked after too many failed attempts, reauthorize to unlock"}
+        text = store.open_token(passkey, salt, token)
+        if text is None:
+            return {"row": row, "data_id": data_id, "error": "Incorrect passkey"}
+        opened.add(data_id)
+        if kind == "file":
+            return {"row": row, "data_id": data_id, "error": f"'{text}' is a file, retrieve it on its own"}
+        return {"row": row, "data_id": data_id, "data": text}
+
+    passkeys = len({field(record, "passkey") for record in records} - {""})
+    results = run_pool(
+        decrypt, list(enumerate(records, start=1)), max_workers, on_progress,
+        lambda item, error: {"row": item[0], "data_id": field(item[1], "data_id"), "error": f"Could not decrypt: {error}"}
+    )
+    if lockout is not None and opened:
+        lockout.reset_many(sorted(opened))
+    return results, summarize(results, started, passkeys)
+
+
+def results_csv(results):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=["row", "data_id", "data", "error"], extrasaction="ignore")
+    writer.writeheader()
+    writer.writerows(results)
+    return buffer.getvalue()
@@ -0,0 +1,116 @@
+import os
+import struct
+
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+# File format: a header, then one AES-GCM frame per chunk of plaintext.
+#   header: magic, chunk size, random 8-byte nonce prefix
+#   frame i: chunk i encrypted with nonce = prefix + i, tag appended
+# Every frame authenticates the header, its own index and whether it is the
+# last frame, so frames can't be reordered, dropped or the file truncated
+# without decryption failing. All frames but the last hold exactly
+# chunk_size bytes, so frame i can be found and decrypted on its own.
+MAGIC = b"SDC1"
+HEADER = struct.Struct(">4sI8s")
+TAG_BYTES = 16
+DEFAULT_CHUNK_SIZE = 64 * 1024
+MAX_CHUNKS = 2 ** 32
+
+
+class ChunkedFormatError(ValueError):
+    pass
+
+
+def read_full(source, size):
+    # file.read() may return less than asked before the end of the stream
+    data = b""
+    while len(data) < size:
+        piece = source.read(size - len(data))
+        if not piece:
+            break
+        data += piece
+    return data
+
+
+def frame_nonce(prefix, index):
+    return prefix + struct.pack(">I", index)
+
+
+def frame_aad(header, index, final):
+    return header + struct.pack(">Q?", index, final)
+
+
+def read_header(source):
+    header = read_full(source, HEADER.size)
+    if len(header) < HEADER.size:
+        raise ChunkedFormatError("File is too short to be encrypted data")
+    magic, chunk_size, prefix = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ChunkedFormatError("File is not in the chunked encryption format")
+    return header, chunk_size, prefix
+
+
+def encrypt_stream(key, source, target, chunk_size=DEFAULT_CHUNK_SIZE):
+    # Reads source and writes the encrypted file to target holding at most
+    # two chunks in memory. Returns the number of frames written.
+    aead = AESGCM(key)
+    prefix = os.urandom(8)
+    header = HEADER.pack(MAGIC, chunk_size, prefix)
+    target.write(header)
+    index = 0
+    chunk = read_full(source, chunk_size)
+    while True:
+        if index >= MAX_CHUNKS:
+            raise ChunkedFormatError("Too many chunks for one file, use a larger chunk size")
+        # One chunk of read-ahead tells whether this frame is the last
+        next_chunk = read_full(source, chunk_size)
+        final = not next_chunk
+        target.write(aead.encrypt(frame_nonce(prefix, index), chunk, frame_aad(header, index, final)))
+        if final:
+            return index + 1
+        chunk = next_chunk
+        index += 1
+
+
+def decrypt_chunks(key, source):
+    # Yields the plaintext chunk by chunk. Raises InvalidTag for a wrong
+    # key or a modified file, before yielding anything from a bad frame.
+    aead = AESGCM(key)
+    header, chunk_size, prefix = read_header(source)
+    frame_size = chunk_size + TAG_BYTES
+    index = 0
+    frame = read_full(source, frame_size)
+    while True:
+        next_frame = read_full(source, frame_size)
+        final = not next_frame
+        yield aead.decrypt(frame_nonce(prefix, index), frame, frame_aad(header, index, final))
+        if final:
+            return
+        frame = next_frame
+        index += 1
+
+
+def decrypt_stream(key, source, target):
+    written = 0
+    for chunk in decrypt_chunks(key, source):
+        target.write(chunk)
+        written += len(chunk)
+    return written
+
+
+def chunk_count(source):
+    _, chunk_size, _ = read_header(source)
+    body = source.seek(0, os.SEEK_END) - HEADER.size
+    return max(1, -(-body // (chunk_size + TAG_BYTES)))
+
+
+def decrypt_chunk(key, source, index):
+    # Random access: decrypts chunk index alone from a seekable source
+    count = chunk_count(source)
+    if not 0 <= index < count:
+        raise IndexError(f"Chunk {index} is out of range, the file has {count} chunks")
+    source.seek(0)
+    header, chunk_size, prefix = read_header(source)
+    source.seek(HEADER.size + index * (chunk_size + TAG_BYTES))
+    frame = read_full(source, chunk_size + TAG_BYTES)
+    return AESGCM(key).decrypt(frame_nonce(prefix, index), frame, frame_aad(header, index, index == count - 1))
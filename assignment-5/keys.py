@@ -0,0 +1,88 @@
+import base64
+import hashlib
+import hmac
+import os
+import threading
+from collections import OrderedDict
+
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+# scrypt cost parameters for new stores; a store keeps the ones it was
+# created with
+SCRYPT_N = int(os.getenv("SECURE_KDF_N", 2 ** 14))
+SCRYPT_R = 8
+SCRYPT_P = 1
+KEY_CACHE_SIZE = int(os.getenv("SECURE_KEY_CACHE_SIZE", 256))
+
+
+def derive_master_key(passkey, salt, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P):
+    # The slow, salted step: run once per passkey and cached below
+    return hashlib.scrypt(passkey.encode(), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r + 2 ** 20, dklen=32)
+
+
+def entry_key(master_key, entry_salt):
+    # The fast step: every entry gets its own Fernet key from its own salt
+    key = HKDF(algorithm=hashes.SHA256(), length=32, salt=entry_salt, info=b"secure-data-entry").derive(master_key)
+    return base64.urlsafe_b64encode(key)
+
+
+def stream_key(master_key, entry_salt):
+    # Raw AES-256 key for the chunked file format, kept apart from the
+    # entry's Fernet key by a different HKDF info
+    return HKDF(algorithm=hashes.SHA256(), length=32, salt=entry_salt, info=b"secure-data-stream").derive(master_key)
+
+
+class KeyCache:
+    # Master keys already derived in this process, least recently used
+    # dropped first. Passkeys are never kept: entries are found by an HMAC
+    # of the passkey under a random per-process secret. Threads asking for
+    # the same key at once wait for a single derivation.
+
+    def __init__(self, max_entries=KEY_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.secret = os.urandom(32)
+        self.keys = OrderedDict()
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def master_key(self, passkey, salt, params):
+        lookup = hmac.new(self.secret, repr((salt, tuple(params))).encode() + passkey.encode(), hashlib.sha256).digest()
+        with self.lock:
+            if lookup in self.keys:
+                self.keys.move_to_end(lookup)
+                self.hits += 1
+                return self.keys[lookup]
+            derivation = self.pending.get(lookup)
+            owner = derivation is None
+            if owner:
+                derivation = self.pending[lookup] = threading.Lock()
+                derivation.acquire()
+                self.misses += 1
+        if not owner:
+            with derivation:
+                return self.master_key(passkey, salt, params)
+        try:
+            key = derive_master_key(passkey, salt, *params)
+            with self.lock:
+                self.keys[lookup] = key
+                while len(self.keys) > self.max_entries:
+                    self.keys.popitem(last=False)
+            return key
+        finally:
+            with self.lock:
+                del self.pending[lookup]
+            derivation.release()
+
+    def clear(self):
+        with self.lock:
+            self.keys.clear()
+
+    def stats(self):
+        with self.lock:
+            return {"keys": len(self.keys), "hits": self.hits, "misses": self.misses}
+
+
+key_cache = KeyCache()
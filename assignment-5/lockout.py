@@ -0,0 +1,131 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+from secure_store import STORE_PATH
+
+LOCKOUT_PATH = os.getenv("SECURE_LOCKOUT_PATH", STORE_PATH)
+MAX_ATTEMPTS = int(os.getenv("SECURE_MAX_ATTEMPTS", 3))
+REFILL_SECONDS = float(os.getenv("SECURE_LOCKOUT_REFILL_SECONDS", 30))
+SWEEP_SECONDS = 60
+
+
+class Lockout:
+    # Token bucket per data ID, shared by every session and server process
+    # using the same database file. Each attempt takes a token up front and
+    # a correct passkey resets the bucket. While the bucket isn't empty one
+    # token comes back every refill_seconds up to max_attempts, which only
+    # rate-limits slow guessing. Once an attempt takes the last token the
+    # data ID stays locked, without refill, until reset() is called after
+    # reauthorization. A row whose bucket would be full again carries no
+    # information, so unlocked rows are swept by that expiry time.
+
+    def __init__(self, path=LOCKOUT_PATH, max_attempts=MAX_ATTEMPTS, refill_seconds=REFILL_SECONDS):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.refill_seconds = refill_seconds
+        self.swept_at = 0.0
+        self.lock = threading.Lock()
+        with closing(self.connect()) as conn:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS lockouts ("
+                "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL, expires REAL NOT NULL, "
+                "locked INTEGER NOT NULL DEFAULT 0)"
+            )
+            if "locked" not in [column[1] for column in conn.execute("PRAGMA table_info(lockouts)")]:
+                conn.execute("ALTER TABLE lockouts ADD COLUMN locked INTEGER NOT NULL DEFAULT 0")
+            conn.execute("CREATE INDEX IF NOT EXISTS lockouts_expires ON lockouts (expires)")
+
+    def connect(self):
+        # Autocommit, so take_many() can open its own write transaction.
+        # Under WAL, synchronous NORMAL only syncs at checkpoints instead of
+        # on every commit.
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        conn.execute("PRAGMA synchronous = NORMAL")
+        return conn
+
+    def state(self, conn, key, now):
+        # (tokens, locked) for key at time now
+        row = conn.execute("SELECT tokens, updated, locked FROM lockouts WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return float(self.max_attempts), False
+        if row[2]:
+            return 0.0, True
+        return min(float(self.max_attempts), row[0] + (now - row[1]) / self.refill_seconds), False
+
+    def wait_for(self, tokens, locked):
+        # Seconds until the next attempt, None while locked until reset
+        if locked:
+            return None
+        return 0.0 if tokens >= 1 else (1 - tokens) * self.refill_seconds
+
+    def take(self, key):
+        # Returns (allowed, seconds until the next attempt is allowed, or
+        # None when the data ID is locked until reset)
+        return self.take_many([key])[0]
+
+    def take_many(self, keys):
+        # One attempt per key, in order, a key may repeat. Returns one
+        # take() result per key. The reads and updates run in one immediate
+        # transaction, so concurrent attempts from any process can't take
+        # the same token twice.
+        now = time.time()
+        results = []
+        with closing(self.connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for key in keys:
+                    tokens, locked = self.state(conn, key, now)
+                    allowed = not locked and tokens >= 1
+                    if allowed:
+                        tokens -= 1
+                        locked = tokens < 1
+                    expires = float("inf") if locked else now + (self.max_attempts - tokens) * self.refill_seconds
+                    conn.execute(
+                        "INSERT OR REPLACE INTO lockouts VALUES (?, ?, ?, ?, ?)",
+                        (key, tokens, now, expires, int(locked))
+                    )
+                    results.append((allowed, self.wait_for(tokens, locked)))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        self.sweep(now)
+        return results
+
+    def remaining(self, key):
+        with closing(self.connect()) as conn:
+            return int(self.state(conn, key, time.time())[0])
+
+    def locked(self, key):
+        with closing(self.connect()) as conn:
+            return self.state(conn, key, time.time())[1]
+
+    def retry_after(self, key):
+        with closing(self.connect()) as conn:
+            return self.wait_for(*self.state(conn, key, time.time()))
+
+    def reset(self, key):
+        self.reset_many([key])
+
+    def reset_many(self, keys):
+        # One transaction for the whole batch
+        with closing(self.connect()) as conn, conn:
+            conn.execute("BEGIN")
+            conn.executemany("DELETE FROM lockouts WHERE key = ?", [(key,) for key in keys])
+
+    def sweep(self, now=None):
+        # Runs at most once a minute per process
+        now = time.time() if now is None else now
+        with self.lock:
+            if now - self.swept_at < SWEEP_SECONDS:
+                return
+            self.swept_at = now
+        with closing(self.connect()) as conn:
+            conn.execute("DELETE FROM lockouts WHERE expires <= ?", (now,))
+
+
+lockout = Lockout()
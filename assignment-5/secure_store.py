@@ -0,0 +1,168 @@
+import json
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import closing
+
+from cryptography.exceptions import InvalidTag
+from cryptography.fernet import Fernet, InvalidToken
+
+from chunked import DEFAULT_CHUNK_SIZE, decrypt_chunk, decrypt_stream, encrypt_stream
+from keys import SCRYPT_N, SCRYPT_P, SCRYPT_R, entry_key, key_cache, stream_key
+
+STORE_PATH = os.getenv("SECURE_STORE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".secure_store.sqlite"))
+FILES_DIR = os.getenv("SECURE_FILES_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".secure_files"))
+SALT_BYTES = 16
+LOOKUP_BATCH_SIZE = 500
+
+
+class SecureStore:
+    # Encrypted entries on disk, looked up by data ID through the primary
+    # key. Only ciphertext and salts are stored; a wrong passkey shows up as
+    # a token that fails authentication. File entries keep their contents
+    # in files_dir in the chunked format (chunked.py) and only the
+    # encrypted file name in the table.
+
+    def __init__(self, path=STORE_PATH, files_dir=FILES_DIR):
+        self.path = path
+        self.files_dir = files_dir
+        with closing(self.connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "data_id TEXT PRIMARY KEY, salt BLOB NOT NULL, token BLOB NOT NULL, created REAL NOT NULL, "
+                "kind TEXT NOT NULL DEFAULT 'text')"
+            )
+            if "kind" not in [column[1] for column in conn.execute("PRAGMA table_info(entries)")]:
+                conn.execute("ALTER TABLE entries ADD COLUMN kind TEXT NOT NULL DEFAULT 'text'")
+            kdf = {"salt": os.urandom(SALT_BYTES).hex(), "params": [SCRYPT_N, SCRYPT_R, SCRYPT_P]}
+            conn.execute("INSERT OR IGNORE INTO meta VALUES ('kdf', ?)", (json.dumps(kdf),))
+            conn.execute("INSERT OR IGNORE INTO meta VALUES ('entries', '0')")
+            kdf = json.loads(conn.execute("SELECT value FROM meta WHERE key = 'kdf'").fetchone()[0])
+        self.kdf_salt = bytes.fromhex(kdf["salt"])
+        self.kdf_params = tuple(kdf["params"])
+
+    def connect(self):
+        return sqlite3.connect(self.path, timeout=5)
+
+    def master_key(self, passkey):
+        return key_cache.master_key(passkey, self.kdf_salt, self.kdf_params)
+
+    def cipher(self, passkey, salt):
+        return Fernet(entry_key(self.master_key(passkey), salt))
+
+    def file_path(self, data_id):
+        return os.path.join(self.files_dir, f"{data_id}.sdc")
+
+    def seal(self, text, passkey):
+        # Encrypts one text entry without storing it: (data_id, salt, token)
+        salt = os.urandom(SALT_BYTES)
+        return str(uuid.uuid4()), salt, self.cipher(passkey, salt).encrypt(text.encode())
+
+    def insert_many(self, entries, kind="text"):
+        # Stores sealed entries in one transaction
+        now = time.time()
+        with closing(self.connect()) as conn, conn:
+            conn.executemany(
+                "INSERT INTO entries (data_id, salt, token, created, kind) VALUES (?, ?, ?, ?, ?)",
+                [(data_id, salt, token, now, kind) for data_id, salt, token in entries],
+            )
+            conn.execute("UPDATE meta SET value = CAST(value AS INTEGER) + ? WHERE key = 'entries'", (len(entries),))
+        return [data_id for data_id, _, _ in entries]
+
+    def put(self, text, passkey):
+        return self.insert_many([self.seal(text, passkey)])[0]
+
+    def put_file(self, source, name, passkey, chunk_size=DEFAULT_CHUNK_SIZE):
+        # Streams source into an encrypted file; the entry is only added
+        # once the file is complete. Nothing is left behind on failure.
+        data_id = str(uuid.uuid4())
+        salt = os.urandom(SALT_BYTES)
+        os.makedirs(self.files_dir, exist_ok=True)
+        path = self.file_path(data_id)
+        try:
+            with open(path + ".part", "wb") as target:
+                encrypt_stream(stream_key(self.master_key(passkey), salt), source, target, chunk_size)
+            os.replace(path + ".part", path)
+            self.insert_many([(data_id, salt, self.cipher(passkey, salt).encrypt(name.encode()))], "file")
+        except BaseException:
+            for leftover in (path + ".part", path):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+            raise
+        return data_id
+
+    def kind(self, data_id):
+        # "text", "file", or None for an unknown ID
+        with closing(self.connect()) as conn:
+            row = conn.execute("SELECT kind FROM entries WHERE data_id = ?", (data_id,)).fetchone()
+        return row[0] if row else None
+
+    def __contains__(self, data_id):
+        return self.kind(data_id) is not None
+
+    def row(self, data_id):
+        with closing(self.connect()) as conn:
+            row = conn.execute("SELECT salt, token FROM entries WHERE data_id = ?", (data_id,)).fetchone()
+        if row is None:
+            raise KeyError(data_id)
+        return row
+
+    def rows(self, data_ids):
+        # {data_id: (salt, token, kind)} for the IDs that exist
+        data_ids = list(dict.fromkeys(data_ids))
+        found = {}
+        with closing(self.connect()) as conn:
+            for start in range(0, len(data_ids), LOOKUP_BATCH_SIZE):
+                batch = data_ids[start:start + LOOKUP_BATCH_SIZE]
+                placeholders = ", ".join("?" * len(batch))
+                for data_id, salt, token, kind in conn.execute(
+                    f"SELECT data_id, salt, token, kind FROM entries WHERE data_id IN ({placeholders})", batch
+                ):
+                    found[data_id] = (salt, token, kind)
+        return found
+
+    def open_token(self, passkey, salt, token):
+        # The entry's text, or None for a wrong passkey
+        try:
+            return self.cipher(passkey, salt).decrypt(token).decode()
+        except InvalidToken:
+            return None
+
+    def get(self, data_id, passkey):
+        # Raises KeyError for an unknown ID, returns None for a wrong
+        # passkey. For a file entry this is the file name.
+        salt, token = self.row(data_id)
+        return self.open_token(passkey, salt, token)
+
+    def get_file(self, data_id, passkey, target):
+        # Decrypts a file entry into target chunk by chunk. Returns the file
+        # name, or None for a wrong passkey. A damaged or truncated file
+        # raises InvalidTag or ChunkedFormatError, possibly after part of
+        # it was written to target.
+        name = self.get(data_id, passkey)
+        if name is None:
+            return None
+        salt, _ = self.row(data_id)
+        with open(self.file_path(data_id), "rb") as source:
+            decrypt_stream(stream_key(self.master_key(passkey), salt), source, target)
+        return name
+
+    def get_file_chunk(self, data_id, passkey, index):
+        # One chunk of a file entry without decrypting the rest
+        salt, _ = self.row(data_id)
+        try:
+            with open(self.file_path(data_id), "rb") as source:
+                return decrypt_chunk(stream_key(self.master_key(passkey), salt), source, index)
+        except InvalidTag:
+            return None
+
+    def count(self):
+        # Kept as a counter so it stays cheap with millions of entries
+        with closing(self.connect()) as conn:
+            return int(conn.execute("SELECT value FROM meta WHERE key = 'entries'").fetchone()[0])
+
+
+secure_store = SecureStore()
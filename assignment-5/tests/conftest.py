@@ -0,0 +1,20 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# The app imports its modules by bare name and opens its stores on import,
+# so both point at a scratch directory before anything is imported
+scratch = tempfile.mkdtemp()
+os.environ["SECURE_STORE_PATH"] = os.path.join(scratch, "store.sqlite")
+os.environ["SECURE_FILES_DIR"] = os.path.join(scratch, "files")
+os.environ["SECURE_KDF_N"] = str(2 ** 10)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def store(tmp_path):
+    from secure_store import SecureStore
+
+    return SecureStore(str(tmp_path / "store.sqlite"), str(tmp_path / "files"))
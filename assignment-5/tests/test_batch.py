@@ -0,0 +1,43 @@
+from batch import decrypt_records, encrypt_records
+
+
+def test_bad_record_does_not_abort_the_batch(store):
+    records = [
+        {"data": "first", "passkey": "a"},
+        {"data": "\ud800", "passkey": "a"},
+        {"data": "", "passkey": "a"},
+        {"data": "last", "passkey": "b"},
+    ]
+    results, stats = encrypt_records(store, records, max_workers=2)
+    assert [result["row"] for result in results] == [1, 2, 3, 4]
+    assert "Could not encrypt" in results[1]["error"]
+    assert "error" in results[2]
+    assert stats["succeeded"] == 2
+    assert store.count() == 2
+
+    decrypted, _ = decrypt_records(store, [
+        {"data_id": results[0]["data_id"], "passkey": "a"},
+        {"data_id": results[3]["data_id"], "passkey": "b"},
+    ])
+    assert [result["data"] for result in decrypted] == ["first", "last"]
+
+
+def test_decrypt_batch_shares_the_lockout(store, tmp_path):
+    from lockout import Lockout
+
+    lockout = Lockout(str(tmp_path / "lockout.sqlite"), max_attempts=3, refill_seconds=30)
+    data_id = encrypt_records(store, [{"data": "secret", "passkey": "right"}])[0][0]["data_id"]
+    other_id = encrypt_records(store, [{"data": "other", "passkey": "x"}])[0][0]["data_id"]
+    records = [{"data_id": data_id, "passkey": passkey} for passkey in ["w1", "w2", "w2", "right", "right"]]
+    records.append({"data_id": other_id, "passkey": "wrong"})
+    results, _ = decrypt_records(store, records, lockout=lockout)
+    # The repeated wrong guess counts once, so the right passkey is still
+    # allowed, and it resets the bucket it opened
+    assert [result.get("data", result.get("error")) for result in results[:5]] == [
+        "Incorrect passkey", "Incorrect passkey", "Incorrect passkey", "secret", "secret"
+    ]
+    assert lockout.remaining(data_id) == 3
+    assert lockout.remaining(other_id) == 2
+
+    results, _ = decrypt_records(store, [{"data_id": other_id, "passkey": p} for p in ["a", "b", "x"]], lockout=lockout)
+    assert results[2]["error"].startswith("Locked")
@@ -0,0 +1,90 @@
+import io
+import os
+
+import pytest
+from cryptography.exceptions import InvalidTag
+
+from chunked import HEADER, TAG_BYTES, ChunkedFormatError, decrypt_chunk, decrypt_stream, encrypt_stream
+
+KEY = bytes(range(32))
+CHUNK_SIZE = 16
+
+
+def encrypt(data, chunk_size=CHUNK_SIZE):
+    target = io.BytesIO()
+    encrypt_stream(KEY, io.BytesIO(data), target, chunk_size)
+    return target.getvalue()
+
+
+def decrypt(blob, key=KEY):
+    target = io.BytesIO()
+    decrypt_stream(key, io.BytesIO(blob), target)
+    return target.getvalue()
+
+
+@pytest.mark.parametrize("size", [0, 1, CHUNK_SIZE - 1, CHUNK_SIZE, CHUNK_SIZE + 1, 5 * CHUNK_SIZE, 5 * CHUNK_SIZE + 3])
+def test_round_trip(size):
+    data = os.urandom(size)
+    blob = encrypt(data)
+    assert decrypt(blob) == data
+    frames = max(1, -(-size // CHUNK_SIZE))
+    for index in range(frames):
+        chunk = decrypt_chunk(KEY, io.BytesIO(blob), index)
+        assert chunk == data[index * CHUNK_SIZE:(index + 1) * CHUNK_SIZE]
+
+
+def test_wrong_key():
+    with pytest.raises(InvalidTag):
+        decrypt(encrypt(b"secret data"), bytes(32))
+
+
+@pytest.mark.parametrize("cut", ["frame", "inside_frame", "tag", "header"])
+def test_truncation_is_detected(cut):
+    blob = encrypt(os.urandom(3 * CHUNK_SIZE))
+    frame = CHUNK_SIZE + TAG_BYTES
+    end = {
+        "frame": HEADER.size + 2 * frame,
+        "inside_frame": HEADER.size + frame + 5,
+        "tag": len(blob) - 1,
+        "header": HEADER.size - 1,
+    }[cut]
+    with pytest.raises((InvalidTag, ChunkedFormatError)):
+        decrypt(blob[:end])
+
+
+def test_reordered_frames_are_detected():
+    blob = encrypt(os.urandom(3 * CHUNK_SIZE))
+    frame = CHUNK_SIZE + TAG_BYTES
+    first = slice(HEADER.size, HEADER.size + frame)
+    second = slice(HEADER.size + frame, HEADER.size + 2 * frame)
+    swapped = blob[:HEADER.size] + blob[second] + blob[first] + blob[HEADER.size + 2 * frame:]
+    with pytest.raises(InvalidTag):
+        decrypt(swapped)
+
+
+def test_store_round_trip_and_truncated_file(store):
+    data = os.urandom(5 * CHUNK_SIZE + 3)
+    data_id = store.put_file(io.BytesIO(data), "notes.bin", "passkey", chunk_size=CHUNK_SIZE)
+    target = io.BytesIO()
+    assert store.get_file(data_id, "passkey", target) == "notes.bin"
+    assert target.getvalue() == data
+    assert store.get_file(data_id, "wrong", io.BytesIO()) is None
+
+    path = store.file_path(data_id)
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - CHUNK_SIZE - TAG_BYTES)
+    with pytest.raises(InvalidTag):
+        store.get_file(data_id, "passkey", io.BytesIO())
+
+
+def test_failed_put_file_leaves_nothing_behind(store):
+    class Broken(io.BytesIO):
+        def read(self, size=-1):
+            if self.tell() >= CHUNK_SIZE:
+                raise OSError("upload interrupted")
+            return super().read(size)
+
+    with pytest.raises(OSError):
+        store.put_file(Broken(os.urandom(4 * CHUNK_SIZE)), "broken.bin", "passkey", chunk_size=CHUNK_SIZE)
+    assert os.listdir(store.files_dir) == []
+    assert store.count() == 0
@@ -0,0 +1,83 @@
+import time
+
+import pytest
+
+from lockout import Lockout
+
+
+@pytest.fixture
+def lockout(tmp_path):
+    return Lockout(str(tmp_path / "lockout.sqlite"), max_attempts=3, refill_seconds=30)
+
+
+def age(lockout, key, seconds):
+    # Moves the bucket's last update into the past instead of sleeping
+    with lockout.connect() as conn:
+        conn.execute("UPDATE lockouts SET updated = updated - ? WHERE key = ?", (seconds, key))
+
+
+def test_attempts_are_limited(lockout):
+    assert [lockout.take("id")[0] for _ in range(4)] == [True, True, True, False]
+    assert lockout.remaining("id") == 0
+    assert lockout.locked("id")
+    assert lockout.take("id") == (False, None)
+
+
+def test_empty_bucket_stays_locked_until_reset(lockout):
+    for _ in range(3):
+        lockout.take("id")
+    age(lockout, "id", 3600)
+    assert lockout.locked("id")
+    assert lockout.retry_after("id") is None
+    assert not lockout.take("id")[0]
+    lockout.reset("id")
+    assert lockout.remaining("id") == 3
+    assert lockout.take("id") == (True, 0.0)
+
+
+def test_partial_bucket_refills(lockout):
+    lockout.take("id")
+    lockout.take("id")
+    assert lockout.remaining("id") == 1
+    age(lockout, "id", 30)
+    assert lockout.remaining("id") == 2
+    age(lockout, "id", 3600)
+    assert lockout.remaining("id") == 3
+    assert not lockout.locked("id")
+
+
+def test_keys_are_independent(lockout):
+    for _ in range(3):
+        lockout.take("a")
+    assert lockout.locked("a")
+    assert lockout.take("b")[0]
+
+
+def test_sweep_keeps_locked_rows(lockout):
+    for _ in range(3):
+        lockout.take("locked")
+    lockout.take("partial")
+    age(lockout, "partial", 3600)
+    with lockout.connect() as conn:
+        conn.execute("UPDATE lockouts SET expires = expires - 3600 WHERE key = 'partial'")
+    lockout.swept_at = 0.0
+    lockout.sweep(time.time())
+    with lockout.connect() as conn:
+        keys = [row[0] for row in conn.execute("SELECT key FROM lockouts")]
+    assert keys == ["locked"]
+
+
+def test_take_many_counts_repeated_keys(lockout):
+    results = lockout.take_many(["a", "b", "a", "a", "a"])
+    assert [allowed for allowed, _ in results] == [True, True, True, True, False]
+    assert results[3] == (True, None)
+    assert lockout.locked("a")
+    assert lockout.remaining("b") == 2
+
+
+def test_reset_many(lockout):
+    lockout.take_many(["a", "a", "a", "b", "c"])
+    lockout.reset_many(["a", "b"])
+    assert lockout.remaining("a") == 3
+    assert lockout.remaining("b") == 3
+    assert lockout.remaining("c") == 2